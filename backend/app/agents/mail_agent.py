@@ -1,6 +1,7 @@
 # app/agents/mail_agent.py
 from app.agents.base_agent import BaseAgent
-from google import genai
+from app.services.llm_client import generate_text
+from fastapi.concurrency import run_in_threadpool
 import smtplib
 from email.mime.text import MIMEText
 import os
@@ -12,19 +13,18 @@ class MailAgent(BaseAgent):
         self.email = email
         self.password = password
 
-        api_key = gemini_api_key or os.environ.get("GEMINI_API_KEY")
-        if not api_key:
+        if not (gemini_api_key or os.environ.get("GEMINI_API_KEY")):
             raise ValueError("GEMINI_API_KEY is not set")
-        self.genai_client = genai.Client(api_key=api_key)
 
-    def run(self, project_id: str, context: dict, prompt: str, recipient: str):
+    def _send(self, message):
+        with smtplib.SMTP_SSL(self.smtp_host, self.smtp_port) as server:
+            server.login(self.email, self.password)
+            server.send_message(message)
+
+    async def run(self, project_id: str, context: dict, prompt: str, recipient: str):
         full_prompt = f"Project info: {context}\n\nTask: {prompt}"
 
-        response = self.genai_client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=full_prompt
-        )
-        text = response.candidates[0].content.parts[0].text
+        text = await generate_text(full_prompt)
 
         if "Subject" in text:
             parts = text.split("Subject:", 1)[1].strip().split("\n", 1)
@@ -39,8 +39,6 @@ class MailAgent(BaseAgent):
         message["from"] = self.email
         message["subject"] = subject
 
-        with smtplib.SMTP_SSL(self.smtp_host, self.smtp_port) as server:
-            server.login(self.email, self.password)
-            server.send_message(message)
+        await run_in_threadpool(self._send, message)
 
         return {"status": "success", "subject": subject, "body": body}
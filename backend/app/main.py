@@ -1,6 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes import agents, tools, projects, resources, auth, graph, chat, google_services
+from app.services.worker_pool import shutdown_pool
+from app.services.providers import close_providers, aclose_providers
+from app.services.neo4j_schema import bootstrap_schema
+from app.services.project_versions import check_version_backend
+import asyncio
+import os
 
 app = FastAPI(
     title="Agent Benchmark API",
@@ -33,6 +39,22 @@ app.include_router(graph.router, prefix="/graph", tags=["Graph"])
 app.include_router(google_services.router, prefix="/google-services", tags=["Google_Services"])
 app.include_router(chat.router, prefix="/chat", tags=["Chat"])
 
+@app.on_event("startup")
+async def startup():
+    check_version_backend()
+
+    # Runs in the background so an unreachable Neo4j doesn't hold up the API;
+    # set NEO4J_SCHEMA_ON_STARTUP=0 to manage the schema with
+    # `python -m app.services.neo4j_schema` instead
+    if os.environ.get("NEO4J_SCHEMA_ON_STARTUP", "1") == "1":
+        asyncio.get_running_loop().run_in_executor(None, bootstrap_schema)
+
+@app.on_event("shutdown")
+async def shutdown():
+    shutdown_pool()
+    close_providers()
+    await aclose_providers()
+
 @app.get("/")
 def root():
     return {"message": "Agent Benchmark API is running"}
@@ -4,20 +4,18 @@ from app.services.agent_service import call_phi3mini
 from typing import List, Optional
 import uuid
 import requests
-from supabase import create_client
 import httpx
 from uuid import UUID
 from dotenv import load_dotenv
 from fastapi.security import OAuth2PasswordBearer
 import jwt
-from google import genai
 import os
+from app.services.providers import get_supabase
+from app.services.llm_client import generate_text
 
 load_dotenv()
 router = APIRouter()
 
-client = genai.Client()
-
 
 class ChatRequest(BaseModel):
     message: str
@@ -31,7 +29,6 @@ SECRET_KEY = os.environ.get("JWT_SECRET")
 ALGORITHM = os.environ.get("JWT_ALGORITHM")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 def extract_doc_id(doc_url: str):
     """Extract the Google Doc ID from URL"""
@@ -104,7 +101,7 @@ async def create_workflow(req: CreateWorkflowRequest, current_user: dict = Depen
     try:
         # Insert workflow
         workflow_res = (
-            supabase.table("Workflows")
+            get_supabase().table("Workflows")
             .insert({
                 "input_resource_id": req.input,
                 "prompt": req.llm,
@@ -152,7 +149,7 @@ class WorkflowItem(BaseModel):
 async def list_workflows(current_user: dict = Depends(get_current_user)):
     try:
         workflows_res = (
-            supabase
+            get_supabase()
             .table("Workflows")
             .select("*")
             .eq("created_by", current_user["id"])
@@ -201,7 +198,7 @@ async def run_workflow(
     try:
         # 1. Fetch workflow
         workflow_res = (
-            supabase.table("Workflows")
+            get_supabase().table("Workflows")
             .select("*")
             .eq("new_id", workflow_id)
             .eq("created_by", user["id"])
@@ -219,8 +216,8 @@ async def run_workflow(
         prompt = workflow["prompt"]
 
         # 2. Fetch input/output resources
-        input_res = supabase.table("Resources").select("*").eq("id", input_res_id).maybe_single().execute()
-        output_res = supabase.table("Resources").select("*").eq("id", output_res_id).maybe_single().execute()
+        input_res = get_supabase().table("Resources").select("*").eq("id", input_res_id).maybe_single().execute()
+        output_res = get_supabase().table("Resources").select("*").eq("id", output_res_id).maybe_single().execute()
 
         print(input_res)
         if not input_res.data or not output_res.data:
@@ -233,7 +230,7 @@ async def run_workflow(
             raise HTTPException(status_code=400, detail="Resource doc_id missing")
 
         # 3. Get user access token
-        user_res = supabase.table("Users").select("*").eq("id", user["id"]).maybe_single().execute()
+        user_res = get_supabase().table("Users").select("*").eq("id", user["id"]).maybe_single().execute()
         access_token = user_res.data.get("access_token")
         refresh_token = user_res.data.get("refresh_token")
 
@@ -246,7 +243,7 @@ async def run_workflow(
         if input_doc_resp.status_code == 401:
             # refresh token
             access_token = refresh_google_token(refresh_token)
-            supabase.table("Users").update({"access_token": access_token}).eq("id", user["id"]).execute()
+            get_supabase().table("Users").update({"access_token": access_token}).eq("id", user["id"]).execute()
             headers["Authorization"] = f"Bearer {access_token}"
             input_doc_resp = requests.get(f"https://docs.googleapis.com/v1/documents/{input_doc_id}", headers=headers)
 
@@ -258,12 +255,7 @@ async def run_workflow(
         ])
 
         # 5. Call AI on input text
-        llm_response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=f"{prompt}\n\n{input_text}"  # combine prompt + input text
-        )
-
-        llm_response_parsed = llm_response.candidates[0].content.parts[0].text
+        llm_response_parsed = await generate_text(f"{prompt}\n\n{input_text}")  # combine prompt + input text
 
         # 6. Update output document
         requests_body = [{"insertText": {"location": {"index": 1}, "text": llm_response_parsed}}]
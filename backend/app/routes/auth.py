@@ -1,6 +1,5 @@
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, field_validator
-from supabase import create_client
 import os, jwt
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
@@ -8,6 +7,7 @@ from passlib.hash import sha256_crypt
 from google.oauth2 import id_token
 from google.auth.transport import requests
 import requests as http
+from app.services.providers import get_supabase
 
 load_dotenv()
 router = APIRouter()
@@ -16,7 +16,6 @@ SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_OAUTH_CLIENT_ID")
 GOOGLE_CLIENT_SECRET=os.environ.get("GOOGLE_OAUTH_CLIENT_SECRET")
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 SECRET_KEY = os.environ.get("JWT_SECRET")
 ALGORITHM = os.environ.get("JWT_ALGORITHM")
@@ -55,12 +54,12 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
 def signup(user: UserCreate):
     hashed_pw = sha256_crypt.hash(user.password)
 
-    existing = supabase.table("Users").select("*").eq("email", user.email).execute()
+    existing = get_supabase().table("Users").select("*").eq("email", user.email).execute()
     if existing.data:
         raise HTTPException(status_code=400, detail="User already exists")
     
     try:
-        res = supabase.table("Users").insert({
+        res = get_supabase().table("Users").insert({
         "email": user.email,
         "password": hashed_pw,
         "full_name": user.full_name
@@ -73,7 +72,7 @@ def signup(user: UserCreate):
 @router.post("/login")
 def login(user: UserLogin):
     try:
-        res = supabase.table("Users").select("*").eq("email", user.email).single().execute()
+        res = get_supabase().table("Users").select("*").eq("email", user.email).single().execute()
     except Exception as e:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
@@ -100,7 +99,7 @@ def get_me(request: Request):
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    res = supabase.table("Users").select("id, email, full_name").eq("id", payload["user_id"]).single().execute()
+    res = get_supabase().table("Users").select("id, email, full_name").eq("id", payload["user_id"]).single().execute()
     if not res.data:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -138,7 +137,7 @@ def google_oauth_login(payload: dict):
     try:
 
         user_res = (
-        supabase
+        get_supabase()
             .table("Users")
             .select("*")
             .eq("email", email)
@@ -148,17 +147,17 @@ def google_oauth_login(payload: dict):
         #print(user_res)
         print("user_data:", user_res)
         if user_res:
-            supabase.table("Users").update({
+            get_supabase().table("Users").update({
                 "access_token": google_access_token
             }).eq("email", email).execute()
             user_data = user_res.data
             if refresh_token:
-                supabase.table("Users").update({
+                get_supabase().table("Users").update({
                     "refresh_token": refresh_token
                 }).eq("email", email).execute()
         if not user_res:
             insert_res = (
-                supabase
+                get_supabase()
                 .table("Users")
                 .insert({
                     "email": email,
@@ -1,9 +1,17 @@
 from fastapi import APIRouter, HTTPException, Request, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from app.services.llm_service import query_neo4j_with_llm, clean_llm_response, generate_llm_response
-from app.services.projects_service import get_resource_text
-from app.services.neo4j_service import run_cypher_query
+from app.services.llm_service import query_neo4j_with_llm, clean_llm_response, generate_llm_response, stream_llm_response
+from app.services.projects_service import ResourceTextLoader
+from fastapi.concurrency import run_in_threadpool
+from app.services.neo4j_async_service import run_cypher_query, stream_cypher_query
+from app.services.cypher_params import plan_cache_stats
+from app.services.intent_router import route_query
+from app.services.answer_cache import answer_cache
+from app.services.cypher_memo import cypher_memo
+from app.services.passage_index import passage_index
 from dotenv import load_dotenv
+import json
 
 load_dotenv()
 router = APIRouter()
@@ -26,17 +34,15 @@ async def get_cipher_query(req: LLMQuery, project_id:str = Query(...)):
         query = clean_llm_response(result)
         print(query)
 
-        db_result = run_cypher_query(query)
+        db_result = await run_cypher_query(query, guard=True)
 
         context = {}
 
-        for record in db_result.get("results", []):
-          print("record: ", record)
-          resource = record.get("r")
-          if resource:
-              resource_id = resource["id"]
-              # Assume get_parsed_text is imported and returns text
-              context[resource_id] = get_resource_text(resource_id)
+        # One Supabase round trip for every distinct resource in the results
+        resources = [record.get("r") for record in db_result.get("results", []) if record.get("r")]
+        texts = await run_in_threadpool(ResourceTextLoader().load_many, [r["id"] for r in resources])
+        for resource in resources:
+            context[resource["id"]] = texts[str(resource["id"])]
 
         print(context)
         
@@ -50,64 +56,227 @@ async def get_cipher_query(req: LLMQuery, project_id:str = Query(...)):
         print(e)
         raise HTTPException(status_code=500, detail=str(e))
     
+async def _retrieve(req: LLMQuery, project_id: str):
+    """
+    Steps 1-3 of the chat flow as an async generator of (stage, data) pairs, so the
+    JSON and SSE routes share them: "cypher" for every query about to run, then
+    "results" once Neo4j answers, then "context" if any resources were found.
+    """
+    # Step 1: Common query shapes map straight to a Cypher template;
+    # anything else (or a template that finds nothing) goes to the LLM
+    route = route_query(req.query, project_id, req.selected_resources)
+    resources = []
+    if route:
+        cypher_query = route["cypher"]
+        print(f"🧭 Routed to {route['intent']} template (confidence {route['confidence']})")
+        yield "cypher", {"cypher_query": cypher_query, "intent": route["intent"], "confidence": route["confidence"]}
+        db_result = await run_cypher_query(cypher_query, route["params"])
+        resources = db_result.get("results", [])
+
+    if not resources:
+        # Cypher the LLM wrote earlier for a question of the same shape
+        memo = cypher_memo.lookup(req.query, project_id, req.selected_resources)
+        db_result = None
+        if memo:
+            cypher_query, params = memo
+            print(f"♻️ Reusing memoised Cypher: {cypher_query}")
+            yield "cypher", {"cypher_query": cypher_query, "intent": None, "confidence": None, "memoised": True}
+            try:
+                db_result = await run_cypher_query(cypher_query, params, guard=True)
+            except Exception as e:
+                print(f"Memoised Cypher failed, asking the LLM: {e}")
+
+        if db_result is None or "rejected_reasons" in db_result:
+            llm_result = await query_neo4j_with_llm(req.query, project_id, req.selected_resources)
+            cypher_query = clean_llm_response(llm_result)
+            print(f"🧠 Generated Cypher: {cypher_query}")
+            yield "cypher", {"cypher_query": cypher_query, "intent": None, "confidence": None}
+
+            # Step 2: Run the Cypher query (raises if it fails, so failing Cypher is never memoised)
+            db_result = await run_cypher_query(cypher_query, guard=True)
+            if "rejected_reasons" not in db_result:
+                cypher_memo.store(req.query, project_id, req.selected_resources, cypher_query)
+        resources = db_result.get("results", [])
+
+    yield "results", {"cypher_query": cypher_query, "db_result": db_result}
+    if not resources:
+        return
+
+    # Step 3: Gather context from the best passages of the retrieved resources
+    retrieved = {}
+    for record in resources:
+        r = record.get("r") or record.get("resource")
+        if r and r.get("id") and r.get("name"):
+            retrieved[str(r["id"])] = r["name"]
+
+    # Resources ingested before the passage index existed are indexed on first use
+    missing = passage_index.missing(project_id, retrieved)
+    if missing:
+        texts = await run_in_threadpool(ResourceTextLoader().load_many, missing)
+        for rid in missing:
+            text = texts[rid]["parsed_text"] if texts[rid] else None
+            await run_in_threadpool(passage_index.index_resource, project_id, rid, text)
+
+    passages = await run_in_threadpool(passage_index.select, project_id, list(retrieved), req.query)
+
+    # Resources in order of their best passage, each one's passages in document order
+    by_resource = {}
+    for passage in passages:
+        by_resource.setdefault(passage["resource_id"], []).append(passage)
+    context = {
+        retrieved[rid]: "\n\n".join(p["text"] for p in sorted(chosen, key=lambda p: p["position"]))
+        for rid, chosen in by_resource.items()
+    }
+
+    yield "context", {"context": context}
+
 @router.post('/llm')
 async def chat_with_context(req: LLMQuery, project_id: str = Query(...)):
     """
     Full flow:
-    1. Convert user query → Cypher query (via LLM)
+    1. Convert user query → Cypher query (intent template, else LLM)
     2. Execute Cypher on Neo4j
-    3. For each Resource node, fetch parsed text as context
-    4. Pass {user query + context} → LLM for reasoning
+    3. Pick the best passages of the matched resources as context
+    4. Pass {user query + passages} → LLM for reasoning
     5. Return Cypher, db_result, context, and final LLM response
     """
     try:
-        # Step 1: Generate Cypher query using LLM
-        llm_result = await query_neo4j_with_llm(req.query, project_id, req.selected_resources)
-        cypher_query = clean_llm_response(llm_result)
-        print(f"🧠 Generated Cypher: {cypher_query}")
+        # Same question, same resources, unchanged project: serve the stored answer
+        cache_key = await answer_cache.key(req.query, project_id, req.selected_resources)
+        cached = await answer_cache.get(cache_key)
+        if cached:
+            return cached
 
-        # Step 2: Run the Cypher query
-        db_result = run_cypher_query(cypher_query)
-        resources = db_result.get("results", [])
+        stages = {}
+        async for stage, data in _retrieve(req, project_id):
+            stages[stage] = data
+        cypher_query = stages["results"]["cypher_query"]
+        db_result = stages["results"]["db_result"]
 
-        if not resources:
+        if "context" not in stages:
             return {
                 "message": "No relevant data found.",
-                "cypher_query": cypher_query
+                "cypher_query": cypher_query,
+                "rejected_reasons": db_result.get("rejected_reasons", [])
             }
-
-        # Step 3: Gather context from all retrieved resources
-        context = {}
-        for record in resources:
-            r = record.get("r") or record.get("resource")
-            if not r:
-                continue
-
-            resource_id = r.get("id")
-            resource_name = r.get("name")
-            if not resource_id or not resource_name:
-                continue
-
-            # Fetch pre-parsed text for that resource
-            parsed_text = get_resource_text(resource_id)
-            context[resource_name] = parsed_text
+        context = stages["context"]["context"]
 
         # Step 4: Generate the LLM’s reasoning response
-        llm_response = await generate_llm_response(req.query, {
-            "cypher_query": cypher_query,
-            "db_result": db_result,
-            "context": context
-        })
+        llm_response = await generate_llm_response(req.query, context)
 
         # Step 5: Return complete structured response
-        return {
+        response = {
             "cypher_query": cypher_query,
             "db_result": db_result,
             "context": context,
             "llm_response": llm_response
         }
+        await answer_cache.put(cache_key, response)
+        return response
 
     except Exception as e:
         print(f"❌ Error in /llm route: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def _results_summary(db_result: dict) -> dict:
+    rows = db_result.get("results", [])
+    names = {(row.get("r") or row.get("resource") or {}).get("name") for row in rows}
+    return {
+        "count": len(rows),
+        "truncated": db_result.get("truncated", False),
+        "resources": sorted(name for name in names if name),
+        "rejected_reasons": db_result.get("rejected_reasons", []),
+    }
+
+@router.post('/llm/stream')
+async def stream_chat_with_context(req: LLMQuery, project_id: str = Query(...)):
+    """
+    /llm as Server-Sent Events, sent as each stage finishes:
+    cypher → results (summary) → token (answer chunks as the model writes them) → done.
+    Failures after the stream has started arrive as an error event.
+    """
+    async def events():
+        try:
+            cache_key = await answer_cache.key(req.query, project_id, req.selected_resources)
+            cached = await answer_cache.get(cache_key)
+            if cached:
+                # Replay the stored answer through the same events, in one token
+                yield _sse("cypher", {"cypher_query": cached["cypher_query"], "cached": True})
+                yield _sse("results", _results_summary(cached["db_result"]))
+                yield _sse("token", {"text": cached["llm_response"]})
+                yield _sse("done", {"llm_response": cached["llm_response"]})
+                return
+
+            context = None
+            async for stage, data in _retrieve(req, project_id):
+                if stage == "cypher":
+                    yield _sse("cypher", data)
+                elif stage == "results":
+                    cypher_query, db_result = data["cypher_query"], data["db_result"]
+                    yield _sse("results", _results_summary(db_result))
+                elif stage == "context":
+                    context = data["context"]
+
+            if context is None:
+                yield _sse("done", {"message": "No relevant data found.", "llm_response": None})
+                return
+
+            answer = []
+            async for token in stream_llm_response(req.query, context):
+                answer.append(token)
+                yield _sse("token", {"text": token})
+            await answer_cache.put(cache_key, {
+                "cypher_query": cypher_query,
+                "db_result": db_result,
+                "context": context,
+                "llm_response": "".join(answer)
+            })
+            yield _sse("done", {"llm_response": "".join(answer)})
+
+        except Exception as e:
+            print(f"❌ Error in /llm/stream route: {e}")
+            yield _sse("error", {"detail": str(e)})
+
+    # X-Accel-Buffering: keep reverse proxies from holding events back
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.post("/cypher/stream")
+async def stream_cypher_results(req: LLMQuery, project_id: str = Query(...)):
+    """
+    Full, uncapped results of a chat query as NDJSON (one row per line), for
+    callers that need more than the capped rows /llm returns.
+    """
+    route = route_query(req.query, project_id, req.selected_resources)
+    if route:
+        rows = stream_cypher_query(route["cypher"], route["params"])
+    else:
+        llm_result = await query_neo4j_with_llm(req.query, project_id, req.selected_resources)
+        rows = stream_cypher_query(clean_llm_response(llm_result), guard=True)
+
+    async def ndjson():
+        try:
+            async for row in rows:
+                yield json.dumps(row, default=str) + "\n"
+        except Exception as e:
+            # Headers are already sent; report the failure as the last line
+            print(f"❌ Error streaming Cypher results: {e}")
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@router.get("/answer-cache/stats")
+def get_answer_cache_stats():
+    return answer_cache.stats()
+
+@router.get("/passage-index/stats")
+def get_passage_index_stats():
+    return passage_index.stats()
+
+@router.get("/cypher-stats")
+def get_cypher_stats():
+    """Estimated Neo4j plan-cache hit rate for generated Cypher after normalisation, and Cypher memo hits"""
+    return {**plan_cache_stats.stats(), "memo": cypher_memo.stats()}
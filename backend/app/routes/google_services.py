@@ -1,14 +1,20 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel, field_validator
-from supabase import create_client
 import os, jwt
 from dotenv import load_dotenv
 import requests
 from fastapi.security import OAuth2PasswordBearer
+from fastapi.concurrency import run_in_threadpool
 import requests as http
 import httpx
 from typing import List, Optional
-from app.services.neo4j_service import add_resource_to_graph, link_resource_to_concept, extract_concepts, add_resource_with_concepts, add_project_to_graph
+from app.services.neo4j_service import add_resource_to_graph, link_resource_to_concept, extract_concepts, add_project_to_graph
+from app.services.neo4j_async_service import add_resource_with_concepts
+from app.services.worker_pool import run_in_pool
+from app.services.ingest_cache import ingest_cache
+from app.services.passage_index import passage_index
+from app.services.ingest_jobs import ingest_queue, no_retry, IngestQueueFull
+from app.services.providers import get_supabase
 
 
 load_dotenv()
@@ -20,7 +26,6 @@ GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_OAUTH_CLIENT_ID")
 GOOGLE_CLIENT_SECRET=os.environ.get("GOOGLE_OAUTH_CLIENT_SECRET")
 SECRET_KEY = os.environ.get("JWT_SECRET")
 ALGORITHM = os.environ.get("JWT_ALGORITHM")
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 def get_current_user(token: str = Depends(oauth2_scheme)):
@@ -33,7 +38,7 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
 @router.get("/docs")
 def list_google_docs(user=Depends(get_current_user)):
     user_res=(
-      supabase.table("Users")
+      get_supabase().table("Users")
       .select("*")
       .eq("id", user["id"])
       .maybe_single()
@@ -76,7 +81,7 @@ def list_google_docs(user=Depends(get_current_user)):
             print("failed to get refresh token")
             raise HTTPException(status_code=400, detail="Failed to refresh token")
         
-        supabase.table("Users").update({
+        get_supabase().table("Users").update({
             "access_token": new_access_token
         }).eq("google_id", google_user["google_id"]).execute()
 
@@ -138,17 +143,42 @@ async def fetch_doc_text(doc_id: str, access_token: str) -> str:
     
     return response.text
 
-@router.post("/import-docs")
+async def fetch_doc_revision(doc_id: str, access_token: str) -> str:
+    """
+    The doc's current modifiedTime, read from Drive with the caller's token. Also
+    proves the caller can read the doc, so it must succeed before the ingest
+    cache is consulted.
+    """
+    url = f"https://www.googleapis.com/drive/v3/files/{doc_id}?fields=modifiedTime"
+
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url, headers={"Authorization": f"Bearer {access_token}"})
+
+    # Expired token
+    if response.status_code == 401:
+        raise HTTPException(status_code=401, detail="google_token_expired")
+
+    if response.status_code != 200:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to read document {doc_id}: {response.text}"
+        )
+
+    return response.json()["modifiedTime"]
+
+@router.post("/import-docs", status_code=202)
 async def import_docs(
     payload: DocsRequest,
     project_id: str = Query(...),
     user=Depends(get_current_user)
 ):
-    results = []
-
+    """
+    Queue the selected Docs for ingestion (fetch → parse → insert → graph) and
+    return a job ID; poll /resources/jobs/{job_id} for per-doc progress.
+    """
     # Fetch user Google credentials
     user_res = (
-        supabase.table("Users")
+        get_supabase().table("Users")
         .select("*")
         .eq("id", user["id"])
         .maybe_single()
@@ -159,47 +189,83 @@ async def import_docs(
         raise HTTPException(status_code=400, detail="User not found")
 
     google_user = user_res.data
-    access_token = google_user["access_token"]
-    refresh_token = google_user["refresh_token"]
+    # Shared by every doc in the job so a refreshed token is reused
+    tokens = {"access_token": google_user["access_token"], "refresh_token": google_user["refresh_token"]}
 
-    # Try importing each doc
-    for doc in payload.docs:
+    async def with_token(call):
+        # Retries once with a refreshed token if the stored one has expired
         try:
-            try:
-                text = await fetch_doc_text(doc.id, access_token)
-            except HTTPException as err:
-                if isinstance(err, HTTPException) and err.status_code == 401:
-                    access_token = await refresh_google_token(refresh_token)
-
-                    supabase.table("Users").update({"access_token": access_token}).eq(
-                        "id", user["id"]
-                    ).execute()
-
-                    text = await fetch_doc_text(doc.id, access_token)
-                else:
-                    raise err
-
-            # Insert into Resources table
-            db_resp = supabase.table("Resources").insert({
-                "file_name": doc.name,
-                "parsed_text": text,
-                "created_by": user["id"],
-                "project_id": project_id,
-                "file_type": "google doc",
-                "doc_id": doc.id,
-            }).execute()
-
-            concepts = extract_concepts(text)
-            add_resource_to_graph(project_id, doc.name, project_id=project_id, uploaded_by=user["id"])
-            add_resource_with_concepts(db_resp.data[0]['id'], doc.name, project_id, concepts, uploaded_by=user["id"])
-
-            results.append({"doc_id": doc.id, "status": "success"})
-        
+            return await call(tokens["access_token"])
+        except HTTPException as err:
+            if err.status_code != 401:
+                raise
+            tokens["access_token"] = await refresh_google_token(tokens["refresh_token"])
+
+            get_supabase().table("Users").update({"access_token": tokens["access_token"]}).eq(
+                "id", user["id"]
+            ).execute()
+
+            return await call(tokens["access_token"])
+
+    async def fetch_stage(item):
+        doc = item["doc"]
+        # A Drive file at a known revision parses to the same text every time. The
+        # revision comes from Drive itself (never the client), with the caller's
+        # credentials, so only users who can read the doc reach its cache entry
+        revision = await with_token(lambda token: fetch_doc_revision(doc.id, token))
+        item["cache_key"] = ingest_cache.drive_key(doc.id, revision)
+        item["cached"] = ingest_cache.get(item["cache_key"])
+
+        if item["cached"]:
+            item["text"] = item["cached"]["parsed_text"]
+            return
+
+        item["text"] = await with_token(lambda token: fetch_doc_text(doc.id, token))
+
+    async def parse_stage(item):
+        if item["cached"]:
+            item["concepts"] = item["cached"]["concepts"]
+            return
+
+        item["concepts"] = await run_in_pool(extract_concepts, item["text"])
+        ingest_cache.put(item["cache_key"], {"parsed_text": item["text"], "concepts": item["concepts"]})
+
+    @no_retry
+    async def insert_stage(item):
+        doc = item["doc"]
+        # Insert into Resources table
+        db_resp = await run_in_threadpool(lambda: get_supabase().table("Resources").insert({
+            "file_name": doc.name,
+            "parsed_text": item["text"],
+            "created_by": user["id"],
+            "project_id": project_id,
+            "file_type": "google doc",
+            "doc_id": doc.id,
+        }).execute())
+        item["resource_id"] = db_resp.data[0]['id']
+
+    async def index_stage(item):
+        # Not fatal: chat indexes any resource it finds missing from the index
+        try:
+            await run_in_threadpool(passage_index.index_resource, project_id, item["resource_id"], item["text"])
         except Exception as e:
-            results.append({
-                "doc_id": doc.id,
-                "status": "failed",
-                "error": str(e)
-            })
+            print(f"Passage indexing failed for {item['resource_id']}: {e}")
 
-    return {"results": results}
+    async def graph_stage(item):
+        doc = item["doc"]
+        await add_resource_with_concepts(item["resource_id"], doc.name, project_id, item["concepts"], uploaded_by=user["id"])
+        item["result"] = {"doc_id": doc.id, "resource_id": item["resource_id"]}
+
+    items = [{"name": doc.name, "doc": doc} for doc in payload.docs]
+    try:
+        job_id = await ingest_queue.submit("google-docs", items, [
+            ("fetch", fetch_stage),
+            ("parse", parse_stage),
+            ("insert", insert_stage),
+            ("index", index_stage),
+            ("graph", graph_stage),
+        ], owner=user["id"])
+    except IngestQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
+    return {"message": "Docs queued for ingestion", "job_id": job_id, "status_url": f"/resources/jobs/{job_id}"}
@@ -1,14 +1,30 @@
-from fastapi import APIRouter, HTTPException, Request, Query
+from fastapi import APIRouter, HTTPException, Request, Response, Query
 from pydantic import BaseModel
-from supabase import create_client
 import os, jwt
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 from passlib.hash import sha256_crypt
-from app.services.neo4j_service import get_project_graph
+from app.services.graph_cache import get_graph_snapshot
 
 router = APIRouter()
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+  if not if_none_match or not etag:
+    return False
+  if if_none_match.strip() == "*":
+    return True
+  # Compare ignoring weak-validator prefixes, per RFC 9110 weak comparison
+  tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+  return etag in tags
+
 @router.get('')
-def get_graph(project_id: str = Query(...)):
-  return get_project_graph(project_id)
\ No newline at end of file
+async def get_graph(request: Request, project_id: str = Query(...)):
+  etag, body = await get_graph_snapshot(project_id)
+  # no-cache: the browser may keep the graph but must revalidate it every time
+  headers = {"Cache-Control": "no-cache"}
+  if etag:
+    headers["ETag"] = etag
+
+  if _etag_matches(request.headers.get("if-none-match"), etag):
+    return Response(status_code=304, headers=headers)
+  return Response(content=body, media_type="application/json", headers=headers)
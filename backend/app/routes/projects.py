@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from supabase import create_client
 import os, jwt
 import requests
 from dotenv import load_dotenv
@@ -9,25 +8,15 @@ from typing import List
 from app.workflows.google_doc_workflow import run_google_doc_workflow
 from app.workflows.mail_workflow import run_mail_workflow
 from app.services.neo4j_service import add_project_to_graph
-from app.services.google_docs_service import GoogleDocsService
+from app.services.providers import get_supabase
 
 load_dotenv()
 router = APIRouter()
 
-creds_path_var = os.environ.get("GOOGLE_CREDS_JSON")
-if not creds_path_var:
-    raise ValueError("GOOGLE_CREDS_JSON environment variable not set")
-
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-creds_path = os.path.join(BASE_DIR, creds_path_var)
-
-google_docs_service = GoogleDocsService(creds_path)
-
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_OAUTH_CLIENT_ID")
 GOOGLE_CLIENT_SECRET=os.environ.get("GOOGLE_OAUTH_CLIENT_SECRET")
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 SECRET_KEY = os.environ.get("JWT_SECRET")
@@ -68,7 +57,7 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
     
 @router.get("/", response_model=List[ProjectResponse])
 async def get_projects(current_user: dict = Depends(get_current_user)):
-    response = supabase.table("Projects").select("*").eq("created_by", current_user["id"]).execute()
+    response = get_supabase().table("Projects").select("*").eq("created_by", current_user["id"]).execute()
     if response.data:
         return response.data
     else:
@@ -80,7 +69,7 @@ def add_project(project: ProjectRequest, current_user: dict = Depends(get_curren
     project_data = project.dict()
     project_data["created_by"] = current_user["id"]
 
-    response = supabase.table("Projects").insert(project_data).execute()
+    response = get_supabase().table("Projects").insert(project_data).execute()
     project_id = response.data[0]["id"]
     project_name = response.data[0]["name"]
     add_project_to_graph(project_id, project_name)
@@ -92,7 +81,7 @@ def add_project(project: ProjectRequest, current_user: dict = Depends(get_curren
 @router.post("/write-to-docs")
 async def run_workflow(request: WorkflowRequest):
     try:
-        result = run_google_doc_workflow(project_id=request.project_id, prompt=request.prompt)
+        result = await run_google_doc_workflow(project_id=request.project_id, prompt=request.prompt)
         return {"status": "success", "result": result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -128,7 +117,7 @@ async def push_to_docs(req: PushRequest, user: dict = Depends(get_current_user))
     # 1. Get user tokens from Supabase
     print(user)
     user_res = (
-        supabase.table("Users")
+        get_supabase().table("Users")
         .select("*")
         .eq("id", user["id"])
         .maybe_single()
@@ -153,7 +142,7 @@ async def push_to_docs(req: PushRequest, user: dict = Depends(get_current_user))
         # Token expired, refresh it
         access_token = refresh_google_token(refresh_token)
         # Update Supabase with new access token
-        supabase.table("Users").update({"access_token": access_token}).eq("id", user["id"]).execute()
+        get_supabase().table("Users").update({"access_token": access_token}).eq("id", user["id"]).execute()
         headers = {"Authorization": f"Bearer {access_token}"}
         doc_resp = requests.get(f"https://docs.googleapis.com/v1/documents/{doc_id}", headers=headers)
 
@@ -182,7 +171,7 @@ async def push_to_docs(req: PushRequest, user: dict = Depends(get_current_user))
 @router.post("/send-mail")
 async def send_mail(request: MailRequest):
     try:
-        result = run_mail_workflow(
+        result = await run_mail_workflow(
             project_id=request.project_id,
             prompt=request.prompt,
             recipient=request.recipient
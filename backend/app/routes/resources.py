@@ -1,60 +1,33 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
 from pydantic import BaseModel
-from supabase import create_client
 from uuid import UUID
 from typing import Optional, List
-import pdfplumber
-import docx
-import openpyxl
 import os, jwt
-from io import BytesIO
 from dotenv import load_dotenv
 from datetime import datetime
 from fastapi.security import OAuth2PasswordBearer
 from app.services.neo4j_service import add_resource_to_graph, link_resource_to_concept, extract_concepts, add_resource_with_concepts
+from app.services.upload_service import spool_upload
+from app.services.ingest_service import UPLOAD_STAGES, ingest_batch
+from app.services.ingest_cache import ingest_cache
+from app.services.ingest_jobs import ingest_queue, IngestQueueFull
+from app.services.providers import get_supabase
 load_dotenv()
 
 router = APIRouter()
 
+BATCH_UPLOAD_MAX_FILES = int(os.environ.get("BATCH_UPLOAD_MAX_FILES", 100))
+
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
-SUPABASE_BUCKET = os.environ.get("SUPABASE_BUCKET", "resources")
 SECRET_KEY = os.environ.get("JWT_SECRET")
 ALGORITHM = os.environ.get("JWT_ALGORITHM")
 
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
-def extract_text(file: UploadFile):
-    file_ext = file.filename.split(".")[-1].lower()
-    content = ""
-
-    if file_ext == "pdf":
-        with pdfplumber.open(file.file) as pdf:
-            content = "\n".join(page.extract_text() or "" for page in pdf.pages)
-
-    elif file_ext == "docx":
-        doc = docx.Document(file.file)
-        content = "\n".join([p.text for p in doc.paragraphs])
-
-    elif file_ext == "xlsx":
-        wb = openpyxl.load_workbook(file.file)
-        for sheet in wb.worksheets:
-            for row in sheet.iter_rows(values_only=True):
-                content += " ".join(str(cell) for cell in row if cell) + "\n"
-
-    else:
-        try:
-            content = file.file.read().decode("utf-8", errors="ignore")
-        except Exception:
-            content = ""
-
-    return content.strip()
-
-
 class ResourceResponse(BaseModel):
     id: UUID
     created_by: UUID
@@ -69,7 +42,7 @@ class ResourceResponse(BaseModel):
 
 @router.get("/project/{project_id}", response_model=List[ResourceResponse])
 def get_resources_by_project(project_id: UUID):
-    response = supabase.table("Resources").select("*").eq("project_id", str(project_id)).execute()
+    response = get_supabase().table("Resources").select("*").eq("project_id", str(project_id)).execute()
     return response.data
 
 def get_current_user(token: str = Depends(oauth2_scheme)):
@@ -80,59 +53,82 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
         raise HTTPException(status_code=401, detail="Invalid token")
 
 
-@router.post("/upload")
+@router.post("/upload", status_code=202)
 async def upload_resource(
     project_id: UUID = Form(...),
     file: UploadFile = File(...),
     current_user: dict = Depends(get_current_user)
 ):
-    file_name = file.filename
-    file_type = file.content_type
-    file_ext = file_name.split(".")[-1].lower()
-    created_by = current_user["id"]
-
+    """
+    Spool the upload and queue it for ingestion (parse → storage → insert → graph).
+    Returns straight away with a job ID; poll /resources/jobs/{job_id} for progress.
+    """
+    # Spool the upload once (bounded memory, hashed on the way in); the job
+    # feeds both the parser and the storage upload from that spool.
+    upload = await spool_upload(file)
+    item = {
+        "name": file.filename,
+        "upload": upload,
+        "project_id": project_id,
+        "created_by": current_user["id"],
+        "file_type": file.content_type,
+    }
     try:
-        file_bytes = await file.read()
-
-        file.file.seek(0)
-
-        parsed_text = extract_text(file)
-        concepts = extract_concepts(parsed_text)
-
-        path_on_storage = f"{project_id}/{file_name}"
-        upload_resp = supabase.storage.from_(SUPABASE_BUCKET).upload(
-            path_on_storage,
-            file_bytes,
+        job_id = await ingest_queue.submit(
+            "upload", [item], UPLOAD_STAGES, cleanup=upload.close, owner=current_user["id"]
         )
+    except IngestQueueFull as e:
+        upload.close()
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
 
-        if isinstance(upload_resp, dict) and "error" in upload_resp:
-            raise HTTPException(status_code=500, detail=f"Storage upload failed: {upload_resp['error']['message']}")
-
-        file_url = f"{SUPABASE_URL}/storage/v1/object/public/{SUPABASE_BUCKET}/{path_on_storage}"
-
-        insert_data = {
-            "created_by": str(created_by),
-            "project_id": str(project_id),
-            "file_name": file_name,
-            "file_type": file_type,
-            "file_url": file_url,
-            "parsed_text": parsed_text,
-        }
+    return {"message": "File queued for ingestion", "job_id": job_id, "status_url": f"/resources/jobs/{job_id}"}
 
-        db_resp = supabase.table("Resources").insert(insert_data).execute()
-        resource_id = db_resp.data[0]['id']
-        add_resource_with_concepts(resource_id, file_name, project_id, concepts, uploaded_by=created_by)
-        add_resource_to_graph(resource_id, file.filename, project_id, created_by)
+@router.post("/upload-batch")
+async def upload_resources_batch(
+    project_id: UUID = Form(...),
+    files: List[UploadFile] = File(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Upload many files in one request. Parsing runs in parallel across the process
+    pool, the Resources rows go in with one bulk insert and the graph nodes with
+    one Neo4j transaction. Returns a result per file.
+    """
+    if len(files) > BATCH_UPLOAD_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_UPLOAD_MAX_FILES} files per batch")
+
+    uploads = []
+    try:
+        for file in files:
+            uploads.append(await spool_upload(file))
 
-        return {"message": "File uploaded and parsed successfully", "data": db_resp.data[0]}
+        results = await ingest_batch(
+            uploads, str(project_id), current_user["id"], [file.content_type for file in files]
+        )
+        return {"results": results}
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        for upload in uploads:
+            upload.close()
+
+@router.get("/jobs/{job_id}")
+async def get_ingest_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    job = await ingest_queue.get(job_id)
+    # Someone else's job looks the same as a missing one
+    if not job or job.get("owner") != str(current_user["id"]):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/ingest-cache/stats")
+def get_ingest_cache_stats():
+    return ingest_cache.stats()
     
 @router.get('/')
 def get_all_resources(current_user: dict = Depends(get_current_user)):
     response = (
-    supabase
+    get_supabase()
     .table("Resources")
     .select("id, project_id, file_name, created_at, Projects(name)")
     .eq("created_by", current_user["id"])
@@ -0,0 +1,112 @@
+from cachetools import TTLCache
+from dotenv import load_dotenv
+import threading
+import hashlib
+import json
+import re
+import os
+from redis.exceptions import RedisError
+from app.services.project_versions import aget_project_version
+from app.services.providers import get_async_redis
+
+load_dotenv()
+
+ANSWER_CACHE_SIZE = int(os.environ.get("ANSWER_CACHE_SIZE", 1000))
+ANSWER_CACHE_TTL = int(os.environ.get("ANSWER_CACHE_TTL", 60 * 60))
+# Shared answers need shared versions: this also turns on PROJECT_VERSIONS_REDIS
+ANSWER_CACHE_REDIS = os.environ.get("ANSWER_CACHE_REDIS", "0") == "1"
+ANSWER_CACHE_REDIS_TTL = int(os.environ.get("ANSWER_CACHE_REDIS_TTL", ANSWER_CACHE_TTL))
+
+
+def normalise_query(query: str) -> str:
+    """Case, surrounding whitespace/punctuation and inner spacing don't change the question."""
+    query = re.sub(r"\s+", " ", query.lower()).strip()
+    return query.strip(" ?!.")
+
+
+class AnswerCache:
+    """
+    Cache of complete /chat/llm responses. Keys include the project's content
+    version (bumped on every graph write, i.e. on ingest), so an answer is never
+    served once the project's resources have changed. Entries expire after `ttl`
+    seconds and the least recently used go first when `maxsize` is reached; an
+    optional Redis tier shares answers between workers. A Redis failure counts as
+    a miss: the answer is computed again and only kept in this worker.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    async def key(query: str, project_id: str, selected_resources: list[str] | None) -> str | None:
+        """None when the project's version is unknown (Redis down): such answers aren't cached."""
+        version = await aget_project_version(project_id)
+        if version is None:
+            return None
+        parts = [
+            normalise_query(query),
+            str(project_id),
+            sorted(selected_resources or []),
+            version,
+        ]
+        return "answer:" + hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+    async def get(self, key: str | None):
+        if key is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            answer = self._entries.get(key)
+            if answer is not None:
+                self.hits += 1
+                return answer
+
+        if ANSWER_CACHE_REDIS:
+            try:
+                body = await get_async_redis().get(key)
+                answer = json.loads(body) if body else None
+            except (RedisError, OSError, ValueError) as e:
+                print(f"⚠️ Answer cache read failed: {e}")
+                answer = None
+            if answer is not None:
+                with self._lock:
+                    self._entries[key] = answer
+                    self.redis_hits += 1
+                return answer
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    async def put(self, key: str | None, answer: dict):
+        if key is None:
+            return
+        with self._lock:
+            self._entries[key] = answer
+        if ANSWER_CACHE_REDIS:
+            try:
+                await get_async_redis().set(key, json.dumps(answer, default=str), ex=ANSWER_CACHE_REDIS_TTL)
+            except (RedisError, OSError) as e:
+                print(f"⚠️ Answer cache write failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.hits + self.redis_hits
+            lookups = hits + self.misses
+            return {
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self._entries.maxsize,
+            }
+
+
+answer_cache = AnswerCache(ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL)
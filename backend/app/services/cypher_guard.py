@@ -0,0 +1,98 @@
+from dotenv import load_dotenv
+import re
+import os
+from app.services.neo4j_schema import plan_operators
+
+load_dotenv()
+
+# Rows a generated query may return when it doesn't say (LIMIT is appended)
+CYPHER_ROW_LIMIT = int(os.environ.get("CYPHER_ROW_LIMIT", 500))
+# Upper bound given to variable-length patterns written without one ([*], [*2..])
+CYPHER_MAX_HOPS = int(os.environ.get("CYPHER_MAX_HOPS", 3))
+# Reject plans where any operator is estimated to produce more rows than this
+CYPHER_MAX_ESTIMATED_ROWS = float(os.environ.get("CYPHER_MAX_ESTIMATED_ROWS", 100000))
+# Server-side transaction timeout (seconds) for queries run from chat
+CYPHER_TX_TIMEOUT = float(os.environ.get("CYPHER_TX_TIMEOUT", 15))
+
+_VAR_LENGTH = re.compile(r"\*\s*(\d+\s*)?(\.\.)?\s*\]")
+_UNBOUNDED_IN_PLAN = re.compile(r"\*(\d*\.\.)?\]")
+_FINAL_LIMIT = re.compile(r"\bLIMIT\s+(\$\w+|\d+)\s*$", re.IGNORECASE)
+_RETURN = re.compile(r"\bRETURN\b", re.IGNORECASE)
+
+
+def strip_comments(query: str) -> str:
+    """Drop // and /* */ comments, leaving string literals and `identifiers` intact."""
+    out = []
+    i = 0
+    while i < len(query):
+        ch = query[i]
+        if ch in "'\"`":
+            end = i + 1
+            while end < len(query) and query[end] != ch:
+                end += 2 if query[end] == "\\" and ch != "`" else 1
+            out.append(query[i:end + 1])
+            i = end + 1
+        elif query.startswith("//", i):
+            end = query.find("\n", i)
+            i = len(query) if end < 0 else end
+        elif query.startswith("/*", i):
+            end = query.find("*/", i + 2)
+            out.append(" ")
+            i = len(query) if end < 0 else end + 2
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out)
+
+
+def _bound_hops(match):
+    low, dots = match.group(1), match.group(2)
+    if low and not dots:
+        return match.group(0)  # exact length, e.g. [*2]
+    low = int(low or 1)
+    return f"*{low}..{max(low, CYPHER_MAX_HOPS)}]"
+
+
+def bound_query(query: str, row_limit: int | None = CYPHER_ROW_LIMIT) -> str:
+    """
+    Rewrite a generated query so it can't run away: open-ended variable-length
+    patterns get CYPHER_MAX_HOPS as upper bound and a final LIMIT is added when
+    the query returns rows without one (unless row_limit is None). Comments are
+    removed first so a trailing one can't hide the final LIMIT.
+    """
+    query = strip_comments(query).strip().rstrip(";").strip()
+    query = _VAR_LENGTH.sub(_bound_hops, query)
+    if row_limit and _RETURN.search(query) and not _FINAL_LIMIT.search(query):
+        query = f"{query}\nLIMIT {row_limit}"
+    return query
+
+
+def plan_problems(summary) -> list[str]:
+    """Reasons to reject a query, read from the summary of its EXPLAIN."""
+    reasons = []
+    if summary.query_type not in (None, "r"):
+        reasons.append(f"query writes to the graph (query type '{summary.query_type}')")
+
+    max_rows = 0.0
+    for operator, args in plan_operators(summary.plan or {"operatorType": ""}):
+        details = str(args.get("Details", ""))
+        if operator == "CartesianProduct":
+            reasons.append(f"cartesian product: {details}".rstrip(": "))
+        if "VarLengthExpand" in operator and _UNBOUNDED_IN_PLAN.search(details):
+            reasons.append(f"unbounded variable-length expansion: {details}")
+        max_rows = max(max_rows, float(args.get("EstimatedRows", 0) or 0))
+
+    if max_rows > CYPHER_MAX_ESTIMATED_ROWS:
+        reasons.append(f"estimated {max_rows:.0f} rows exceeds limit of {CYPHER_MAX_ESTIMATED_ROWS:.0f}")
+    return reasons
+
+
+async def guard_cypher(session, query: str, params: dict, row_limit: int | None = CYPHER_ROW_LIMIT):
+    """
+    Bound a generated query, then EXPLAIN it (plans only, nothing runs) on an async
+    session. Returns (query to run, rejection reasons); run it only if there are none.
+    """
+    query = bound_query(query, row_limit)
+    result = await session.run("EXPLAIN " + query, params)
+    summary = await result.consume()
+    return query, plan_problems(summary)
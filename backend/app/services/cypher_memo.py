@@ -0,0 +1,162 @@
+from cachetools import LRUCache
+from dotenv import load_dotenv
+import threading
+import hashlib
+import json
+import re
+import os
+from app.services.cypher_params import parameterise_cypher, CypherNormaliseError
+from app.services.intent_router import fulltext_search
+from app.services.llm_service import CYPHER_PROMPT_VERSION
+
+load_dotenv()
+
+CYPHER_MEMO_SCOPES = int(os.environ.get("CYPHER_MEMO_SCOPES", 1000))
+CYPHER_MEMO_TEMPLATES = int(os.environ.get("CYPHER_MEMO_TEMPLATES", 100))
+# Templates need this many words outside their slots, so "{0}" alone can't match everything
+CYPHER_MEMO_MIN_FIXED_WORDS = int(os.environ.get("CYPHER_MEMO_MIN_FIXED_WORDS", 2))
+
+# How a literal in the generated Cypher was derived from a span of the question
+_RENDERERS = {
+    "lower": lambda span: span,
+    "title": lambda span: span.title(),
+    "fulltext": fulltext_search,
+}
+_WORD = re.compile(r"[\w\-']+")
+
+
+def _normalise(query: str) -> str:
+    return " ".join(_WORD.findall(query.lower()))
+
+
+def _find_slot(words: list[str], value: str):
+    """Shortest span of the question that renders to `value`, as (start, end, renderer)."""
+    for length in range(1, len(words) + 1):
+        for start in range(len(words) - length + 1):
+            span = " ".join(words[start:start + length])
+            for name, render in _RENDERERS.items():
+                if render(span) == value:
+                    return start, start + length, name
+    return None
+
+
+class CypherMemo:
+    """
+    Memo of LLM-generated Cypher per (prompt version, project, resource set),
+    looked up by question template. When a question is stored, the literals the
+    LLM took from it (e.g. a concept name) become slots in both the question and
+    the Cypher, so "what concepts are in quantum physics" can later answer "what
+    concepts are in graph theory" without a Gemini call. Questions whose literals
+    can't be traced back to their words are only reused verbatim.
+    """
+
+    def __init__(self, scopes: int, templates: int):
+        self._scopes = LRUCache(maxsize=scopes)
+        self._templates = templates
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.skipped = 0
+
+    @staticmethod
+    def scope_key(project_id: str, selected_resources: list[str] | None) -> str:
+        parts = [CYPHER_PROMPT_VERSION, str(project_id), sorted(selected_resources or [])]
+        return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+    @staticmethod
+    def _pattern(parts: list) -> re.Pattern:
+        return re.compile(" ".join(re.escape(p) if isinstance(p, str) else r"([\w\-' ]+?)" for p in parts))
+
+    def lookup(self, user_query: str, project_id: str, selected_resources: list[str] | None):
+        """(cypher, params) memoised for this question's template, or None."""
+        query = _normalise(user_query)
+        with self._lock:
+            entries = self._scopes.get(self.scope_key(project_id, selected_resources))
+            for entry in list(entries.values()) if entries else []:
+                match = entry["pattern"].fullmatch(query)
+                if not match:
+                    continue
+                params = {}
+                for name, source in entry["params"].items():
+                    if "slot" in source:
+                        params[name] = _RENDERERS[source["render"]](match.group(source["slot"] + 1))
+                    else:
+                        params[name] = source["value"]
+                entries[entry["key"]]  # refresh recency
+                self.hits += 1
+                return entry["cypher"], params
+            self.misses += 1
+        return None
+
+    def store(self, user_query: str, project_id: str, selected_resources: list[str] | None, cypher: str):
+        """
+        Remember Cypher that has just run successfully for this question. Returns
+        False when it can't be templated safely (and nothing is stored).
+        """
+        entry = self._template(_normalise(user_query).split(), project_id, selected_resources, cypher)
+        scope = self.scope_key(project_id, selected_resources)
+        with self._lock:
+            if entry is None:
+                self.skipped += 1
+                return False
+            if scope not in self._scopes:
+                self._scopes[scope] = LRUCache(maxsize=self._templates)
+            self._scopes[scope][entry["key"]] = entry
+            self.stored += 1
+        return True
+
+    def _template(self, words: list[str], project_id: str, selected_resources: list[str] | None, cypher: str):
+        try:
+            text, literals = parameterise_cypher(cypher)
+        except CypherNormaliseError:
+            return None
+
+        context = {str(project_id)} | set(selected_resources or [])
+        params, spans, constants = {}, {}, []
+        for name, value in literals.items():
+            slot = _find_slot(words, value) if isinstance(value, str) and value and value not in context else None
+            if slot:
+                start, end, render = slot
+                spans.setdefault((start, end), len(spans))
+                params[name] = {"slot": spans[(start, end)], "render": render}
+            else:
+                params[name] = {"value": value}
+                constants.extend(value if isinstance(value, list) else [value])
+
+        # Slots must not overlap, and no constant may still carry a slotted word
+        # (it would silently keep the old term when the slot changes)
+        ordered = sorted(spans)
+        if any(a[1] > b[0] for a, b in zip(ordered, ordered[1:])):
+            return None
+        slot_words = {w for start, end in spans for w in words[start:end]}
+        for constant in constants:
+            if isinstance(constant, str) and slot_words & set(_normalise(constant).split()):
+                return None
+
+        # Question template: the words, with each slotted span replaced by its slot number
+        if len(words) - sum(end - start for start, end in ordered) < CYPHER_MEMO_MIN_FIXED_WORDS:
+            return None
+        parts, position = [], 0
+        for start, end in ordered:
+            parts.extend(words[position:start])
+            parts.append(spans[(start, end)])
+            position = end
+        parts.extend(words[position:])
+
+        return {"key": json.dumps(parts), "pattern": self._pattern(parts), "cypher": text, "params": params}
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "stored": self.stored,
+                "skipped": self.skipped,
+                "prompt_version": CYPHER_PROMPT_VERSION,
+            }
+
+
+cypher_memo = CypherMemo(CYPHER_MEMO_SCOPES, CYPHER_MEMO_TEMPLATES)
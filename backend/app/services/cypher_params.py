@@ -0,0 +1,196 @@
+from cachetools import LRUCache
+from dotenv import load_dotenv
+import threading
+import re
+import os
+
+load_dotenv()
+
+# Size of Neo4j's query (plan) cache, dbms.query_cache_size / server.db.query_cache_size
+CYPHER_PLAN_CACHE_SIZE = int(os.environ.get("CYPHER_PLAN_CACHE_SIZE", 1000))
+
+_ESCAPES = {"\\": "\\", "'": "'", '"': '"', "n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+_LIMIT_CLAUSE = re.compile(r"(LIMIT|SKIP)(\s+)(\d+)(?![\w.])", re.IGNORECASE)
+
+
+class CypherNormaliseError(ValueError):
+    pass
+
+
+def _read_string(query: str, start: int):
+    """Parse the string literal opening at `start`; returns (value, index after it)."""
+    quote = query[start]
+    chars = []
+    i = start + 1
+    while i < len(query):
+        ch = query[i]
+        if ch == "\\":
+            code = query[i + 1:i + 2]
+            if code == "u" and re.fullmatch(r"[0-9a-fA-F]{4}", query[i + 2:i + 6]):
+                chars.append(chr(int(query[i + 2:i + 6], 16)))
+                i += 6
+                continue
+            if code not in _ESCAPES:
+                raise CypherNormaliseError(f"unsupported escape at {i}")
+            chars.append(_ESCAPES[code])
+            i += 2
+            continue
+        if ch == quote:
+            return "".join(chars), i + 1
+        chars.append(ch)
+        i += 1
+    raise CypherNormaliseError("unterminated string literal")
+
+
+def _read_string_list(query: str, start: int):
+    """
+    Parse a list made only of string literals (e.g. a resource scope list)
+    opening at `start`; returns (values, index after it) or None if it isn't one.
+    """
+    values = []
+    i = start + 1
+    while True:
+        while i < len(query) and query[i].isspace():
+            i += 1
+        if i >= len(query) or query[i] not in "'\"":
+            return None
+        value, i = _read_string(query, i)
+        values.append(value)
+        while i < len(query) and query[i].isspace():
+            i += 1
+        if i < len(query) and query[i] == ",":
+            i += 1
+        elif i < len(query) and query[i] == "]":
+            return values, i + 1
+        else:
+            return None
+
+
+def parameterise_cypher(query: str):
+    """
+    Move literals out of a Cypher query into parameters so that queries that only
+    differ in values share one plan-cache entry. String literals, lists of string
+    literals and LIMIT/SKIP counts become $litN; equal values share a parameter.
+    Other numbers are left inline (variable-length bounds can't be parameters).
+    Returns (query, params); raises CypherNormaliseError if the text can't be
+    tokenised safely.
+    """
+    out = []
+    params = {}
+    names = {}
+
+    def param(value):
+        key = repr(value)
+        if key not in names:
+            names[key] = f"lit{len(names)}"
+            params[names[key]] = value
+        return "$" + names[key]
+
+    i = 0
+    while i < len(query):
+        ch = query[i]
+        if ch in "'\"":
+            value, i = _read_string(query, i)
+            out.append(param(value))
+        elif ch == "[" and (parsed := _read_string_list(query, i)):
+            values, i = parsed
+            out.append(param(values))
+        elif ch == "`":
+            end = query.find("`", i + 1)
+            if end < 0:
+                raise CypherNormaliseError("unterminated identifier")
+            out.append(query[i:end + 1])
+            i = end + 1
+        elif query.startswith("//", i):
+            end = query.find("\n", i)
+            end = len(query) if end < 0 else end
+            out.append(query[i:end])
+            i = end
+        elif query.startswith("/*", i):
+            end = query.find("*/", i + 2)
+            if end < 0:
+                raise CypherNormaliseError("unterminated comment")
+            out.append(query[i:end + 2])
+            i = end + 2
+        elif ch == "$":
+            # Already parameterised; we don't know the values
+            raise CypherNormaliseError("query has its own parameters")
+        elif (match := _LIMIT_CLAUSE.match(query, i)) and not (i and (query[i - 1].isalnum() or query[i - 1] == "_")):
+            out.append(match.group(1) + match.group(2) + param(int(match.group(3))))
+            i = match.end()
+        else:
+            out.append(ch)
+            i += 1
+
+    return "".join(out), params
+
+
+class PlanCacheStats:
+    """
+    Client-side estimate of Neo4j's plan-cache hit rate. Neo4j keys cached plans
+    by query text, so a query whose (normalised) text is still among the last
+    `size` distinct texts we sent is counted as a hit.
+    """
+
+    def __init__(self, size: int):
+        self.hits = 0
+        self.misses = 0
+        self.normalised = 0
+        self.fallbacks = 0
+        self._seen = LRUCache(maxsize=size)
+        self._lock = threading.Lock()
+
+    def record(self, query: str, normalised: bool):
+        with self._lock:
+            if normalised:
+                self.normalised += 1
+            else:
+                self.fallbacks += 1
+            if query in self._seen:
+                self.hits += 1
+                self._seen[query]  # refresh recency
+            else:
+                self.misses += 1
+                self._seen[query] = True
+
+    def record_fallback(self):
+        """A normalised query failed and was re-run with its literals inline."""
+        with self._lock:
+            self.normalised -= 1
+            self.fallbacks += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "normalised": self.normalised,
+                "fallbacks": self.fallbacks,
+            }
+
+
+plan_cache_stats = PlanCacheStats(CYPHER_PLAN_CACHE_SIZE)
+
+
+def prepare_cypher(query: str, params: dict | None = None):
+    """
+    Normalisation stage run before executing generated Cypher. Returns
+    (query, params, normalised); queries that can't be normalised come back
+    unchanged with no parameters. Queries that arrive with their own params
+    (templates) are already parameterised and pass through as they are.
+    """
+    if params is not None:
+        plan_cache_stats.record(query, True)
+        return query, params, False
+
+    try:
+        text, params = parameterise_cypher(query)
+        normalised = True
+    except CypherNormaliseError as e:
+        print("Running Cypher as-is, could not parameterise:", e)
+        text, params, normalised = query, {}, False
+
+    plan_cache_stats.record(text, normalised)
+    return text, params, normalised
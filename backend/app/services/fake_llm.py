@@ -0,0 +1,32 @@
+from dotenv import load_dotenv
+import asyncio
+import os
+
+load_dotenv()
+
+# Local stand-in for Gemini, selected with LLM_BACKEND=fake. It answers every
+# prompt with a canned reply streamed word by word, so the chat pipeline (event
+# order, time to first byte) can be exercised without network or API spend.
+FAKE_LLM_FIRST_TOKEN_DELAY = float(os.environ.get("FAKE_LLM_FIRST_TOKEN_DELAY", 0.2))
+FAKE_LLM_TOKEN_DELAY = float(os.environ.get("FAKE_LLM_TOKEN_DELAY", 0.02))
+
+
+def fake_answer(prompt: str) -> str:
+    # An empty answer to a Cypher prompt makes llm_service use its generic query
+    if "Cypher" in prompt and "Return ONLY the Cypher query" in prompt:
+        return ""
+    return f"This is a fake streamed answer to a prompt of {len(prompt)} characters, sent one word at a time."
+
+
+async def fake_stream(prompt: str):
+    """Yield the fake answer word by word, with a first-token and per-token delay."""
+    await asyncio.sleep(FAKE_LLM_FIRST_TOKEN_DELAY)
+    words = fake_answer(prompt).split(" ")
+    for i, word in enumerate(words):
+        if i:
+            await asyncio.sleep(FAKE_LLM_TOKEN_DELAY)
+        yield word if i == len(words) - 1 else word + " "
+
+
+async def fake_generate(prompt: str) -> str:
+    return "".join([token async for token in fake_stream(prompt)])
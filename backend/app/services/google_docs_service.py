@@ -5,7 +5,7 @@ import re
 class GoogleDocsService:
     def __init__(self, creds_json_path: str):
         self.creds = Credentials.from_service_account_file(creds_json_path)
-        self.docs_service = build("docs", "v1", credentials=self.creds)
+        self.docs_service = build("docs", "v1", credentials=self.creds, static_discovery=True, cache_discovery=False)
 
     def _extract_doc_id(self, url: str) -> str:
         """Extract Google Doc ID from full URL or return ID directly."""
@@ -1,10 +1,8 @@
 
-from supabase import create_client
 import os
 
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 class GoogleOAuthService:
   def __init__(self, client_id:str):
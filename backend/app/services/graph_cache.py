@@ -0,0 +1,86 @@
+from cachetools import LRUCache
+from dotenv import load_dotenv
+import threading
+import hashlib
+import json
+import os
+from app.services.neo4j_async_service import fetch_project_graph
+from redis.exceptions import RedisError
+from app.services.project_versions import aget_project_version
+from app.services.providers import get_async_redis
+
+load_dotenv()
+
+GRAPH_CACHE_MAX_BYTES = int(os.environ.get("GRAPH_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# Shared snapshots need shared versions: this also turns on PROJECT_VERSIONS_REDIS
+GRAPH_CACHE_REDIS = os.environ.get("GRAPH_CACHE_REDIS", "0") == "1"
+GRAPH_CACHE_REDIS_TTL = int(os.environ.get("GRAPH_CACHE_REDIS_TTL", 60 * 60))
+
+# project_id -> {"version", "etag", "body"}; bounded by the size of the JSON bodies
+_snapshots = LRUCache(maxsize=GRAPH_CACHE_MAX_BYTES, getsizeof=lambda entry: len(entry["body"]))
+_lock = threading.Lock()
+_EMPTY_GRAPH = json.dumps({"nodes": [], "links": []}).encode()
+
+
+def _etag(project_id: str, version: str) -> str:
+    return '"' + hashlib.sha256(f"{project_id}:{version}".encode()).hexdigest()[:32] + '"'
+
+
+def _remember(project_id: str, entry: dict):
+    # Snapshots bigger than the whole cache are served but not kept
+    if len(entry["body"]) <= GRAPH_CACHE_MAX_BYTES:
+        with _lock:
+            _snapshots[project_id] = entry
+
+
+async def get_graph_snapshot(project_id: str):
+    """
+    Return (etag, json_body) for a project's graph. Snapshots are keyed by the
+    project's content version, so any graph write to the project makes the next
+    call rebuild it. Lookup order: this worker's memory, Redis (if enabled), Neo4j.
+    When Redis is unreachable the graph is read from Neo4j and served uncached.
+    """
+    version = await aget_project_version(project_id)
+    if version is None:
+        return None, await _fetch_body(project_id) or _EMPTY_GRAPH
+    etag = _etag(project_id, version)
+
+    with _lock:
+        entry = _snapshots.get(project_id)
+    if entry and entry["version"] == version:
+        return entry["etag"], entry["body"]
+
+    redis_key = f"graph_snapshot:{project_id}:{version}"
+    if GRAPH_CACHE_REDIS:
+        try:
+            body = await get_async_redis().get(redis_key)
+        except (RedisError, OSError) as e:
+            print(f"⚠️ Graph cache read failed, using Neo4j: {e}")
+            body = None
+        if body:
+            _remember(project_id, {"version": version, "etag": etag, "body": body})
+            return etag, body
+
+    body = await _fetch_body(project_id)
+    if body is None:
+        # Don't pin an error to this version: serve an empty graph uncached
+        return None, _EMPTY_GRAPH
+
+    _remember(project_id, {"version": version, "etag": etag, "body": body})
+    if GRAPH_CACHE_REDIS:
+        try:
+            await get_async_redis().set(redis_key, body, ex=GRAPH_CACHE_REDIS_TTL)
+        except (RedisError, OSError) as e:
+            print(f"⚠️ Graph cache write failed: {e}")
+
+    return etag, body
+
+
+async def _fetch_body(project_id: str):
+    """The project's graph as JSON bytes from Neo4j, or None if the read failed."""
+    try:
+        graph = await fetch_project_graph(project_id)
+    except Exception as e:
+        print("Error fetching graph:", e)
+        return None
+    return json.dumps(graph).encode()
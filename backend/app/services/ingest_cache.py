@@ -0,0 +1,126 @@
+from dotenv import load_dotenv
+import threading
+import tempfile
+import hashlib
+import json
+import os
+
+load_dotenv()
+
+INGEST_CACHE_DIR = os.environ.get("INGEST_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "atlasmind-ingest-cache")
+INGEST_CACHE_MAX_BYTES = int(os.environ.get("INGEST_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+
+def write_json_atomic(path: str, data) -> int:
+    """
+    Write `data` as JSON to `path` via a temp file and a rename, so readers never
+    see a partial file. Creates missing directories; returns the size written.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return size
+
+
+class IngestCache:
+    """
+    Content-addressed cache of ingest results (parsed text, concepts, storage URL)
+    on local disk. Entries are keyed by the file's SHA-256 or by Drive file ID plus
+    revision; file mtimes track recency and the least recently used entries are
+    evicted once the directory grows past `max_bytes`.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._bytes = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def upload_key(sha256: str) -> str:
+        return f"sha256:{sha256}"
+
+    @staticmethod
+    def drive_key(file_id: str, revision: str) -> str:
+        return f"drive:{file_id}:{revision}"
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.json")
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield path, stat.st_size, stat.st_mtime
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            # Mark as recently used for LRU eviction
+            os.utime(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: dict):
+        path = self._path(key)
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        size = write_json_atomic(path, entry)
+
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = sum(entry_size for _, entry_size, _ in self._entries())
+            else:
+                self._bytes += size - old_size
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._bytes = total
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+ingest_cache = IngestCache(INGEST_CACHE_DIR, INGEST_CACHE_MAX_BYTES)
@@ -0,0 +1,212 @@
+from cachetools import TTLCache
+from dotenv import load_dotenv
+from datetime import datetime, timezone
+import redis.asyncio as aioredis
+import asyncio
+import json
+import uuid
+import os
+
+load_dotenv()
+
+INGEST_JOB_BACKEND = os.environ.get("INGEST_JOB_BACKEND", "memory")
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", 4))
+# Jobs waiting for a worker; each queued upload holds its spool (up to
+# UPLOAD_SPOOL_MAX_MEMORY in RAM), so a full queue turns new uploads away
+INGEST_QUEUE_MAX = int(os.environ.get("INGEST_QUEUE_MAX", 32))
+INGEST_STAGE_RETRIES = int(os.environ.get("INGEST_STAGE_RETRIES", 3))
+INGEST_RETRY_BACKOFF = float(os.environ.get("INGEST_RETRY_BACKOFF", 0.5))
+INGEST_JOB_TTL = int(os.environ.get("INGEST_JOB_TTL", 24 * 60 * 60))
+# Jobs the in-memory store keeps; the least recently updated go first
+INGEST_JOB_MAX_JOBS = int(os.environ.get("INGEST_JOB_MAX_JOBS", 1000))
+REDIS_HOST = os.environ.get("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.environ.get("REDIS_PORT", 6379))
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class IngestQueueFull(Exception):
+    """Raised by IngestQueue.submit when INGEST_QUEUE_MAX jobs are already waiting."""
+
+
+def no_retry(stage):
+    """Mark a stage that must run at most once per item (e.g. a non-idempotent insert)."""
+    stage.retry = False
+    return stage
+
+
+class InMemoryJobStore:
+    """
+    Job state kept in this process; used for tests and single-worker deployments.
+    Like the Redis store, jobs expire `ttl` seconds after their last update.
+    """
+
+    def __init__(self, max_jobs: int, ttl: int):
+        self._jobs = TTLCache(maxsize=max_jobs, ttl=ttl)
+
+    async def save(self, job: dict):
+        self._jobs[job["id"]] = json.loads(json.dumps(job))
+
+    async def get(self, job_id: str):
+        return self._jobs.get(job_id)
+
+
+class RedisJobStore:
+    """Job state in Redis so any uvicorn worker can answer status polls."""
+
+    def __init__(self, host: str, port: int, ttl: int):
+        self.ttl = ttl
+        self._redis = aioredis.Redis(host=host, port=port, decode_responses=True)
+
+    async def save(self, job: dict):
+        await self._redis.set(f"ingest_job:{job['id']}", json.dumps(job), ex=self.ttl)
+
+    async def get(self, job_id: str):
+        data = await self._redis.get(f"ingest_job:{job_id}")
+        return json.loads(data) if data else None
+
+
+class IngestQueue:
+    """
+    In-process ingestion queue drained by `workers` asyncio tasks.
+
+    A job is a list of items (one per file or Doc) run through named stages in
+    order. Each stage is an async callable `stage(item)` that reads and writes
+    the item dict; failures are retried with exponential backoff (except for
+    stages marked with `no_retry`, whose writes may have landed), and an item
+    that still fails is marked failed and skipped by later stages. Progress per
+    stage and per item is persisted to the job store after every step.
+    """
+
+    def __init__(self, store, workers: int, retries: int, backoff: float, max_queued: int = 0):
+        self.store = store
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retries = retries
+        self.backoff = backoff
+        self._queue = None
+        self._tasks = []
+
+    def _ensure_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def submit(self, kind: str, items: list, stages: list, cleanup=None, owner: str = None) -> str:
+        """
+        Queue a job and return its ID. `items` are dicts with at least a "name"
+        key, `stages` is a list of (name, async callable) pairs, `cleanup` is an
+        optional callable run once the job has finished and `owner` the ID of
+        the user allowed to read the job's status. Raises IngestQueueFull when
+        `max_queued` jobs are already waiting (nothing is queued or run then).
+        """
+        job = {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "owner": str(owner) if owner else None,
+            "status": "queued",
+            "created_at": _now(),
+            "updated_at": _now(),
+            "stages": [
+                {"name": name, "status": "pending", "done": 0, "failed": 0, "total": len(items)}
+                for name, _ in stages
+            ],
+            "items": [
+                {"name": item["name"], "status": "pending", "stage": None, "attempts": 0, "error": None, "result": None}
+                for item in items
+            ],
+        }
+        self._ensure_workers()
+        try:
+            self._queue.put_nowait((job, items, stages, cleanup))
+        except asyncio.QueueFull:
+            raise IngestQueueFull(f"{self._queue.qsize()} ingest jobs are already queued")
+
+        await self.store.save(job)
+        return job["id"]
+
+    async def get(self, job_id: str):
+        return await self.store.get(job_id)
+
+    async def _worker(self):
+        while True:
+            job, items, stages, cleanup = await self._queue.get()
+            try:
+                await self._run(job, items, stages)
+            except Exception as e:
+                print(f"❌ Ingest job {job['id']} crashed: {e}")
+                job["status"] = "failed"
+                job["error"] = str(e)
+                await self._save(job)
+            finally:
+                if cleanup:
+                    cleanup()
+                self._queue.task_done()
+
+    async def _save(self, job: dict):
+        job["updated_at"] = _now()
+        await self.store.save(job)
+
+    async def _run_stage(self, fn, item: dict, item_state: dict):
+        attempts = self.retries if getattr(fn, "retry", True) else 1
+        for attempt in range(1, attempts + 1):
+            item_state["attempts"] = attempt
+            try:
+                await fn(item)
+                return True
+            except Exception as e:
+                item_state["error"] = str(e)
+                if attempt < attempts:
+                    await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+        return False
+
+    async def _run(self, job: dict, items: list, stages: list):
+        job["status"] = "running"
+        await self._save(job)
+
+        for stage_state, (name, fn) in zip(job["stages"], stages):
+            stage_state["status"] = "running"
+            await self._save(job)
+
+            for item, item_state in zip(items, job["items"]):
+                if item_state["status"] == "failed":
+                    continue
+
+                item_state["status"] = "running"
+                item_state["stage"] = name
+                if await self._run_stage(fn, item, item_state):
+                    item_state["error"] = None
+                    stage_state["done"] += 1
+                else:
+                    item_state["status"] = "failed"
+                    stage_state["failed"] += 1
+                await self._save(job)
+
+            stage_state["status"] = "done"
+            await self._save(job)
+
+        for item, item_state in zip(items, job["items"]):
+            if item_state["status"] != "failed":
+                item_state["status"] = "succeeded"
+                item_state["result"] = item.get("result")
+
+        failed = sum(1 for item_state in job["items"] if item_state["status"] == "failed")
+        if not failed:
+            job["status"] = "succeeded"
+        elif failed == len(job["items"]):
+            job["status"] = "failed"
+        else:
+            job["status"] = "partial"
+        await self._save(job)
+
+
+if INGEST_JOB_BACKEND == "redis":
+    job_store = RedisJobStore(REDIS_HOST, REDIS_PORT, INGEST_JOB_TTL)
+else:
+    job_store = InMemoryJobStore(INGEST_JOB_MAX_JOBS, INGEST_JOB_TTL)
+
+ingest_queue = IngestQueue(job_store, INGEST_WORKERS, INGEST_STAGE_RETRIES, INGEST_RETRY_BACKOFF, INGEST_QUEUE_MAX)
@@ -0,0 +1,282 @@
+from fastapi.concurrency import run_in_threadpool
+from dotenv import load_dotenv
+import tempfile
+import asyncio
+import os
+from app.services.upload_service import UPLOAD_SPOOL_DIR
+from app.services.parsing_service import parse_file, pdf_page_count, extract_pdf_range
+from app.services.worker_pool import run_in_pool, PARSE_POOL_WORKERS
+from app.services.nlp_service import extract_concepts, extract_concepts_batch
+from app.services.ingest_cache import ingest_cache
+from app.services.ingest_jobs import no_retry
+from app.services.passage_index import passage_index
+from app.services.neo4j_async_service import add_resource_with_concepts, add_resources_with_concepts
+from app.services.providers import get_supabase
+
+load_dotenv()
+
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
+SUPABASE_BUCKET = os.environ.get("SUPABASE_BUCKET", "resources")
+
+PDF_PAGES_PER_JOB = int(os.environ.get("PDF_PAGES_PER_JOB", 50))
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", 100))
+
+
+def _page_ranges(page_count: int, pages_per_job: int):
+    # Never split into more slices than there are workers to run them
+    per_job = max(pages_per_job, -(-page_count // PARSE_POOL_WORKERS))
+    return [(start, min(start + per_job, page_count)) for start in range(0, page_count, per_job)]
+
+
+def _write_temp_pdf(data: bytes) -> str:
+    with tempfile.NamedTemporaryFile(prefix="atlasmind-pdf-", suffix=".pdf", dir=UPLOAD_SPOOL_DIR, delete=False) as tmp:
+        tmp.write(data)
+    return tmp.name
+
+
+async def parse_document(source, file_name: str) -> str:
+    """
+    Parse an uploaded document in the process pool. `source` is raw bytes or a
+    path on local disk. PDFs with many pages are split into page ranges that are
+    extracted in parallel and stitched back together in page order; a PDF still
+    in memory is written to a temp file first so each range job reads its own
+    pages instead of being sent the whole document.
+    """
+    file_ext = file_name.split(".")[-1].lower()
+
+    if file_ext == "pdf":
+        page_count = await run_in_pool(pdf_page_count, source)
+        if page_count >= PDF_PARALLEL_MIN_PAGES:
+            path = source if isinstance(source, str) else await run_in_threadpool(_write_temp_pdf, source)
+            try:
+                parts = await asyncio.gather(*[
+                    run_in_pool(extract_pdf_range, path, start, end)
+                    for start, end in _page_ranges(page_count, PDF_PAGES_PER_JOB)
+                ])
+            finally:
+                if path is not source:
+                    os.unlink(path)
+            return "\n".join(parts).strip()
+
+    return await run_in_pool(parse_file, source, file_name)
+
+
+async def analyse_upload(upload):
+    """
+    Parsed text and concepts for a SpooledUpload, served from the ingest cache
+    when the same bytes were ingested before. Returns (cache_key, entry, cache_hit);
+    a cached entry may also carry the `file_url` the bytes were stored at.
+    """
+    cache_key = ingest_cache.upload_key(upload.sha256)
+    cached = ingest_cache.get(cache_key)
+    if cached:
+        return cache_key, cached, True
+
+    parsed_text = await parse_document(upload.path or upload.getvalue(), upload.filename)
+    concepts = await run_in_pool(extract_concepts, parsed_text)
+    return cache_key, {"parsed_text": parsed_text, "concepts": concepts}, False
+
+
+def store_upload(upload, path_on_storage: str) -> str:
+    """Upload a SpooledUpload to Supabase storage and return its public URL."""
+    body = upload.storage_body()
+    try:
+        upload_resp = get_supabase().storage.from_(SUPABASE_BUCKET).upload(
+            path_on_storage,
+            body,
+        )
+    finally:
+        if hasattr(body, "close"):
+            body.close()
+
+    if isinstance(upload_resp, dict) and "error" in upload_resp:
+        raise RuntimeError(f"Storage upload failed: {upload_resp['error']['message']}")
+
+    return f"{SUPABASE_URL}/storage/v1/object/public/{SUPABASE_BUCKET}/{path_on_storage}"
+
+
+# Stages of an upload ingestion job (see ingest_jobs.IngestQueue). Each item
+# carries the SpooledUpload plus project_id, created_by and file_type.
+
+async def parse_stage(item: dict):
+    cache_key, entry, cache_hit = await analyse_upload(item["upload"])
+    item.update(cache_key=cache_key, entry=entry, cache_hit=cache_hit)
+
+
+async def storage_stage(item: dict):
+    upload = item["upload"]
+    entry = item["entry"]
+
+    if not entry.get("file_url"):
+        path_on_storage = f"{item['project_id']}/{upload.filename}"
+        file_url = await run_in_threadpool(store_upload, upload, path_on_storage)
+        entry = {**entry, "file_url": file_url}
+        item["entry"] = entry
+        ingest_cache.put(item["cache_key"], entry)
+
+
+# A retry after a timeout could insert the row twice
+@no_retry
+async def insert_stage(item: dict):
+    upload = item["upload"]
+    entry = item["entry"]
+    insert_data = {
+        "created_by": str(item["created_by"]),
+        "project_id": str(item["project_id"]),
+        "file_name": upload.filename,
+        "file_type": item["file_type"],
+        "file_url": entry["file_url"],
+        "parsed_text": entry["parsed_text"],
+    }
+    db_resp = await run_in_threadpool(lambda: get_supabase().table("Resources").insert(insert_data).execute())
+    item["resource"] = db_resp.data[0]
+
+
+async def index_stage(item: dict):
+    # Chunk the text into passages now so chat never has to read the whole document.
+    # Not fatal: chat indexes any resource it finds missing from the index.
+    try:
+        await run_in_threadpool(
+            passage_index.index_resource, str(item["project_id"]), item["resource"]["id"], item["entry"]["parsed_text"]
+        )
+    except Exception as e:
+        print(f"Passage indexing failed for {item['resource']['id']}: {e}")
+
+
+async def graph_stage(item: dict):
+    resource = item["resource"]
+    await add_resource_with_concepts(
+        resource["id"], resource["file_name"], str(item["project_id"]), item["entry"]["concepts"],
+        uploaded_by=item["created_by"],
+    )
+    item["result"] = {"resource_id": resource["id"], "cache_hit": item["cache_hit"]}
+
+
+UPLOAD_STAGES = [
+    ("parse", parse_stage),
+    ("storage", storage_stage),
+    ("insert", insert_stage),
+    ("index", index_stage),
+    ("graph", graph_stage),
+]
+
+
+async def extract_concepts_many(texts: list[str]) -> list:
+    """
+    Concepts for many texts in one batched spaCy pass. If the batch fails, each
+    text is retried on its own so the failure stays with the text that caused
+    it: the result holds a concept list or an exception per text, in order.
+    """
+    try:
+        return await run_in_pool(extract_concepts_batch, texts)
+    except Exception as e:
+        print(f"Batched concept extraction failed, retrying per file: {e}")
+        return await asyncio.gather(*[run_in_pool(extract_concepts, text) for text in texts], return_exceptions=True)
+
+
+async def ingest_batch(uploads: list, project_id: str, created_by: str, file_types: list) -> list:
+    """
+    Ingest many SpooledUploads at once: parse them concurrently, extract concepts
+    for all of them in one batched spaCy pass and store them, then write all
+    Resources rows in one bulk insert and all graph nodes in one Neo4j
+    transaction. Returns one result dict per upload, in order.
+    """
+    results = [{"file_name": upload.filename, "status": "pending"} for upload in uploads]
+
+    async def parse(upload):
+        cache_key = ingest_cache.upload_key(upload.sha256)
+        cached = ingest_cache.get(cache_key)
+        if cached:
+            return cache_key, cached, True
+        parsed_text = await parse_document(upload.path or upload.getvalue(), upload.filename)
+        return cache_key, {"parsed_text": parsed_text}, False
+
+    parsed = await asyncio.gather(*[parse(upload) for upload in uploads], return_exceptions=True)
+
+    # One nlp.pipe pass over every text that wasn't already in the cache
+    misses = [index for index, outcome in enumerate(parsed) if not isinstance(outcome, Exception) and not outcome[2]]
+    if misses:
+        concept_lists = await extract_concepts_many([parsed[index][1]["parsed_text"] for index in misses])
+        for index, concepts in zip(misses, concept_lists):
+            if isinstance(concepts, Exception):
+                parsed[index] = concepts
+            else:
+                parsed[index][1]["concepts"] = concepts
+
+    async def store(index, outcome):
+        if isinstance(outcome, Exception):
+            raise outcome
+        cache_key, entry, cache_hit = outcome
+        if not entry.get("file_url"):
+            upload = uploads[index]
+            file_url = await run_in_threadpool(store_upload, upload, f"{project_id}/{upload.filename}")
+            entry = {**entry, "file_url": file_url}
+            ingest_cache.put(cache_key, entry)
+        return entry, cache_hit
+
+    prepared = await asyncio.gather(*[store(index, outcome) for index, outcome in enumerate(parsed)], return_exceptions=True)
+
+    ready = []
+    for index, outcome in enumerate(prepared):
+        if isinstance(outcome, Exception):
+            results[index].update(status="failed", error=str(outcome))
+        else:
+            ready.append((index, *outcome))
+
+    if not ready:
+        return results
+
+    rows = [
+        {
+            "created_by": str(created_by),
+            "project_id": str(project_id),
+            "file_name": uploads[index].filename,
+            "file_type": file_types[index],
+            "file_url": entry["file_url"],
+            "parsed_text": entry["parsed_text"],
+        }
+        for index, entry, _ in ready
+    ]
+    db_resp = await run_in_threadpool(lambda: get_supabase().table("Resources").insert(rows).execute())
+
+    # PostgREST returns the inserted rows in the order they were sent
+    graph_resources = []
+    for (index, entry, cache_hit), row in zip(ready, db_resp.data):
+        graph_resources.append({"index": index, "id": row["id"], "name": row["file_name"], "concepts": entry["concepts"]})
+        results[index].update(status="success", resource_id=row["id"], cache_hit=cache_hit)
+
+    def index_passages():
+        # Best effort, per resource: chat indexes any resource missing from the index
+        for (_, entry, _), row in zip(ready, db_resp.data):
+            try:
+                passage_index.index_resource(str(project_id), row["id"], entry["parsed_text"])
+            except Exception as e:
+                print(f"Passage indexing failed for {row['id']}: {e}")
+
+    await run_in_threadpool(index_passages)
+    await write_batch_graph(graph_resources, str(project_id), created_by, results)
+    return results
+
+
+async def write_batch_graph(graph_resources: list, project_id: str, created_by: str, results: list):
+    """
+    Graph nodes for a batch whose Resources rows are already inserted: one
+    transaction for all of them, else one per resource so a failure stays with
+    its file. A file whose graph write still fails keeps its resource_id and is
+    reported "partial" (row stored, graph links missing) so the client doesn't
+    upload it again.
+    """
+    try:
+        await add_resources_with_concepts(graph_resources, project_id, created_by)
+        return
+    except Exception as e:
+        print(f"Batched graph write failed, retrying per resource: {e}")
+
+    for resource in graph_resources:
+        try:
+            await add_resource_with_concepts(
+                resource["id"], resource["name"], project_id, resource["concepts"], uploaded_by=created_by
+            )
+        except Exception as e:
+            results[resource["index"]].update(status="partial", error=f"graph write failed: {e}")
@@ -0,0 +1,158 @@
+from dotenv import load_dotenv
+import os
+import re
+from app.services.neo4j_schema import CONCEPT_NAME_INDEX, RESOURCE_NAME_INDEX
+
+load_dotenv()
+
+# Below this the query goes to the LLM to write Cypher
+INTENT_MIN_CONFIDENCE = float(os.environ.get("INTENT_MIN_CONFIDENCE", 0.75))
+
+# The three query shapes the Cypher prompt in llm_service describes, as templates.
+# Every template returns r (and c) like the LLM-written queries, so the chat route
+# handles both the same way. An empty $resource_names means "no selection".
+_RESOURCE_SCOPE = "(size($resource_names) = 0 OR r.name IN $resource_names)"
+
+CYPHER_TEMPLATES = {
+    "overview": f"""
+MATCH (p:Project {{id: $project_id}})-[:HAS_RESOURCE]->(r:Resource)
+WHERE {_RESOURCE_SCOPE}
+OPTIONAL MATCH (r)-[:COVERS]->(c:Concept)
+RETURN r, c
+""",
+    "concept": f"""
+CALL db.index.fulltext.queryNodes('{CONCEPT_NAME_INDEX}', $search) YIELD node AS c, score
+MATCH (p:Project {{id: $project_id}})-[:HAS_RESOURCE]->(r:Resource)-[:COVERS]->(c)
+WHERE {_RESOURCE_SCOPE}
+RETURN r, c, score
+ORDER BY score DESC
+""",
+    "resource": f"""
+CALL db.index.fulltext.queryNodes('{RESOURCE_NAME_INDEX}', $search) YIELD node AS r, score
+MATCH (p:Project {{id: $project_id}})-[:HAS_RESOURCE]->(r)
+WHERE {_RESOURCE_SCOPE}
+OPTIONAL MATCH (r)-[:COVERS]->(c:Concept)
+RETURN r, c, score
+ORDER BY score DESC
+""",
+}
+
+_STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "for", "to", "and", "or", "about", "is", "are",
+    "what", "which", "me", "my", "this", "that", "these", "those", "any", "all", "do", "does",
+    "resource", "resources", "document", "documents", "file", "files", "doc", "docs", "pdf",
+}
+_LUCENE_SPECIAL = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+_OVERVIEW_PATTERNS = [
+    r"\b(overview|summary|summari[sz]e|recap)\b.*\b(project|everything|all|resources|documents|files|docs)\b",
+    r"^(give me |show me )?(an? )?(overview|summary)\b",
+    r"\bwhat('s| is) (this|the|my) project about\b",
+    r"\b(list|show)( me)?( all)?( the)? (resources|documents|files|docs)\b",
+    r"\bwhat (topics|concepts|themes)\b",
+    r"\bwhat (are|do) (these|the|my|all)( selected)? (resources|documents|files|docs)( cover| about)?\b",
+]
+_RESOURCE_ABOUT = r"\bwhat('s| is) (this|the) (resource|document|file|doc|pdf)( about)?\b"
+_THIS_RESOURCE = r"\bthis (resource|document|file|doc|pdf)\b"
+_EXPLAIN = re.compile(r"^(please )?(explain|summari[sz]e|describe|tell me about|what('s| is) in)\s+(?P<target>.+)$")
+# (pattern, confidence); the target group is the concept to look up
+_CONCEPT_PATTERNS = [
+    (r"\b(which|what) (resources|documents|files|docs|notes)\b.*\b(about|on|cover|covers|mention|mentions|discuss|discusses|regarding)\s+(?P<target>.+)$", 0.9),
+    (r"\b(anything|something|everything|info|information|notes?) (about|on|regarding|related to)\s+(?P<target>.+)$", 0.85),
+    # Only short targets: "what is X" with a long X is a question, not a lookup
+    (r"^(what|who) (is|are) (an? )?(?P<target>[\w\-]+( [\w\-]+){0,2})$", 0.75),
+]
+
+
+def _normalise(text: str) -> str:
+    text = text.lower().strip()
+    text = re.sub(r"[?!.]+$", "", text)
+    return " ".join(text.split())
+
+
+def _stem(file_name: str) -> str:
+    return _normalise(os.path.splitext(file_name)[0].replace("_", " ").replace("-", " "))
+
+
+def fulltext_search(text: str) -> str:
+    """
+    Lucene query for a full-text index: escaped words, each fuzzy-matched (word~).
+    Words under three characters and numbers are dropped, as fuzzy matching them
+    hits nearly anything.
+    """
+    words = [w for w in re.findall(r"[\w\-']+", text.lower())
+             if w not in _STOPWORDS and len(w) >= 3 and any(ch.isalpha() for ch in w)]
+    return " ".join(_LUCENE_SPECIAL.sub(r"\\\1", w) + "~" for w in words)
+
+
+def classify_intent(user_query: str, selected_resources: list[str] | None = None):
+    """
+    Rule-based classifier for the chat query shapes we have templates for.
+    Returns (intent, confidence, slots); intent is None when nothing matches.
+    """
+    query = _normalise(user_query)
+    selected = selected_resources or []
+
+    # A selected resource named in the query is the strongest signal there is
+    named = [name for name in selected
+             if len(_stem(name)) >= 3 and re.search(rf"\b{re.escape(_stem(name))}\b", query)]
+    if named:
+        confidence = 0.95 if _EXPLAIN.match(query) or re.search(r"\babout\b", query) else 0.8
+        return "resource", confidence, {"resource_names": named}
+
+    if re.search(_RESOURCE_ABOUT, query) or (_EXPLAIN.match(query) and re.search(_THIS_RESOURCE, query)):
+        if len(selected) == 1:
+            return "resource", 0.9, {"resource_names": selected}
+        return "overview", 0.8, {}
+
+    for pattern in _OVERVIEW_PATTERNS:
+        if re.search(pattern, query):
+            return "overview", 0.9, {}
+
+    explain = _EXPLAIN.match(query)
+    if explain and (search := fulltext_search(explain.group("target"))):
+        if re.search(r"\b(resource|document|file|doc|pdf|notes?)\b", explain.group("target")):
+            return "resource_search", 0.8, {"search": search}
+        # "explain X" is usually a concept, but it could be a resource title
+        return "concept", 0.7, {"search": search}
+
+    for pattern, confidence in _CONCEPT_PATTERNS:
+        match = re.search(pattern, query)
+        if match:
+            search = fulltext_search(match.group("target"))
+            if search:
+                return "concept", confidence, {"search": search}
+
+    return None, 0.0, {}
+
+
+def route_query(user_query: str, project_id: str, selected_resources: list[str] | None = None):
+    """
+    Map a chat query to a Cypher template without an LLM round trip. Returns
+    {"intent", "confidence", "cypher", "params"}, or None when the classifier
+    isn't confident enough and the LLM should write the query.
+    """
+    intent, confidence, slots = classify_intent(user_query, selected_resources)
+    if intent is None or confidence < INTENT_MIN_CONFIDENCE:
+        return None
+
+    params = {"project_id": str(project_id), "resource_names": list(selected_resources or [])}
+    if intent == "resource":
+        # Resource named exactly: no index lookup needed, just narrow the scope
+        template = "overview"
+        params["resource_names"] = slots["resource_names"]
+    elif intent == "resource_search":
+        template = "resource"
+        params["search"] = slots["search"]
+    elif intent == "concept":
+        template = "concept"
+        params["search"] = slots["search"]
+    else:
+        template = "overview"
+
+    return {
+        "intent": intent,
+        "confidence": confidence,
+        "cypher": CYPHER_TEMPLATES[template].strip(),
+        "params": params,
+    }
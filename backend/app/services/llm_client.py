@@ -0,0 +1,88 @@
+from dotenv import load_dotenv
+import asyncio
+import os
+from app.services.providers import get_genai_client
+from app.services.fake_llm import fake_generate, fake_stream
+
+load_dotenv()
+
+# Every Gemini call in the app goes through here: the SDK's async interface
+# (client.aio) so calls never block the event loop, a concurrency limit per
+# model so a burst of chat traffic can't exhaust quota, and a timeout.
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+# "gemini", or "fake" for the local streaming stand-in in fake_llm
+LLM_BACKEND = os.environ.get("LLM_BACKEND", "gemini")
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", 8))
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", 60))
+
+
+def _per_model(var_name: str, cast):
+    # "gemini-2.5-flash=16,gemini-2.5-pro=4"
+    overrides = {}
+    for item in os.environ.get(var_name, "").split(","):
+        if "=" in item:
+            model, value = item.split("=", 1)
+            overrides[model.strip()] = cast(value)
+    return overrides
+
+LLM_MODEL_CONCURRENCY = _per_model("LLM_MODEL_CONCURRENCY", int)
+LLM_MODEL_TIMEOUTS = _per_model("LLM_MODEL_TIMEOUTS", float)
+
+_semaphores = {}
+
+
+def _semaphore(model: str) -> asyncio.Semaphore:
+    # Created on first use, inside the running loop
+    if model not in _semaphores:
+        _semaphores[model] = asyncio.Semaphore(LLM_MODEL_CONCURRENCY.get(model, LLM_MAX_CONCURRENCY))
+    return _semaphores[model]
+
+
+def _timeout(model: str) -> float:
+    return LLM_MODEL_TIMEOUTS.get(model, LLM_TIMEOUT)
+
+
+def response_text(response) -> str:
+    if not response.candidates:
+        return ""
+    return response.candidates[0].content.parts[0].text or ""
+
+
+async def generate_text(prompt: str, model: str = DEFAULT_MODEL) -> str:
+    """One completion. Waits for a free slot for `model`; raises TimeoutError past its timeout."""
+    async with _semaphore(model):
+        if LLM_BACKEND == "fake":
+            return await asyncio.wait_for(fake_generate(prompt), _timeout(model))
+        response = await asyncio.wait_for(
+            get_genai_client().aio.models.generate_content(model=model, contents=prompt),
+            _timeout(model),
+        )
+    return response_text(response)
+
+
+async def stream_text(prompt: str, model: str = DEFAULT_MODEL):
+    """
+    Completion as text chunks while the model writes it. The slot is held for the
+    whole stream; the timeout applies to the wait for each chunk.
+    """
+    async with _semaphore(model):
+        if LLM_BACKEND == "fake":
+            chunks = fake_stream(prompt)
+        else:
+            chunks = await asyncio.wait_for(
+                get_genai_client().aio.models.generate_content_stream(model=model, contents=prompt),
+                _timeout(model),
+            )
+
+        iterator = chunks.__aiter__()
+        while True:
+            try:
+                chunk = await asyncio.wait_for(iterator.__anext__(), _timeout(model))
+            except StopAsyncIteration:
+                break
+            text = chunk if isinstance(chunk, str) else chunk.text
+            if text:
+                yield text
+
@@ -1,7 +1,6 @@
-from google import genai
-import re, json, ast
-
-client = genai.Client()
+import re, json, ast, hashlib
+from app.services.llm_client import generate_text, stream_text
+from app.services.neo4j_schema import CONCEPT_NAME_INDEX, RESOURCE_NAME_INDEX
 
 def clean_llm_response(llm_response: str):
     llm_response = llm_response.strip()
@@ -20,17 +19,7 @@ def clean_llm_response(llm_response: str):
 
 
 
-async def query_neo4j_with_llm(user_query: str, project_id: str, selected_resources: list[str]):
-    """
-    Generate a Cypher query using LLM while enforcing:
-    - Project scoping
-    - Resource scoping (selected resource IDs)
-    """
-
-    # Format resource_id list into Cypher list syntax
-    resource_list_cypher = "[" + ",".join([f"'{rid}'" for rid in selected_resources]) + "]"
-
-    prompt = f"""
+CYPHER_PROMPT_TEMPLATE = """
     You are an expert in Neo4j and Cypher.
 
     Database structure:
@@ -43,12 +32,21 @@ async def query_neo4j_with_llm(user_query: str, project_id: str, selected_resour
       {resource_list_cypher}
 
     - Use alias r for Resource, c for Concept.
-    - If the user mentions a Concept → filter using:
-      toLower(c.name) CONTAINS toLower(<concept>)
-
-    - If the user asks "what is this resource about", "explain <name>", or includes a resource name → 
-      filter using:
-      toLower(r.name) CONTAINS toLower(<name>)
+    - Never filter names with CONTAINS, =~ or toLower(); names are looked up
+      through full-text indexes, which do fuzzy matching and ranking.
+      Build the search string from the user's words: escape Lucene special
+      characters with a backslash and append ~ to each word (e.g. 'graph~ databas~').
+
+    - If the user mentions a Concept → start the query with:
+      CALL db.index.fulltext.queryNodes('{CONCEPT_NAME_INDEX}', '<words~>') YIELD node AS c, score
+      then MATCH (p:Project {{id: "{project_id}"}})-[:HAS_RESOURCE]->(r:Resource)-[:COVERS]->(c)
+      and ORDER BY score DESC.
+
+    - If the user asks "what is this resource about", "explain <name>", or includes a resource name →
+      start the query with:
+      CALL db.index.fulltext.queryNodes('{RESOURCE_NAME_INDEX}', '<words~>') YIELD node AS r, score
+      then MATCH (p:Project {{id: "{project_id}"}})-[:HAS_RESOURCE]->(r)
+      and ORDER BY score DESC.
 
     - If query is general → return all selected resources and their concepts.
 
@@ -58,17 +56,29 @@ async def query_neo4j_with_llm(user_query: str, project_id: str, selected_resour
     "{user_query}"
     """
 
-    llm_response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt
-    )
+# Identifies the prompt Cypher was generated with; memoised Cypher from an
+# older prompt is never reused (see cypher_memo)
+CYPHER_PROMPT_VERSION = hashlib.sha256(CYPHER_PROMPT_TEMPLATE.encode()).hexdigest()[:16]
 
-    # Extract LLM text safely
-    cypher_text = (
-        llm_response.candidates[0].content.parts[0].text.strip()
-        if llm_response.candidates
-        else ""
+async def query_neo4j_with_llm(user_query: str, project_id: str, selected_resources: list[str]):
+    """
+    Generate a Cypher query using LLM while enforcing:
+    - Project scoping
+    - Resource scoping (selected resource IDs)
+    """
+
+    # Format resource_id list into Cypher list syntax
+    resource_list_cypher = "[" + ",".join([f"'{rid}'" for rid in selected_resources]) + "]"
+
+    prompt = CYPHER_PROMPT_TEMPLATE.format(
+        project_id=project_id,
+        resource_list_cypher=resource_list_cypher,
+        CONCEPT_NAME_INDEX=CONCEPT_NAME_INDEX,
+        RESOURCE_NAME_INDEX=RESOURCE_NAME_INDEX,
+        user_query=user_query,
     )
+
+    cypher_text = (await generate_text(prompt)).strip()
     cypher_text = cypher_text.replace("```", "").replace("cypher", "").strip()
 
     # Force project + resource scoping if missing
@@ -99,12 +109,12 @@ async def query_neo4j_with_llm(user_query: str, project_id: str, selected_resour
 
     return cypher_text.strip()
 
-async def generate_llm_response(user_query: str, context: dict):
+def build_answer_prompt(user_query: str, context: dict):
     context_text = "\n\n".join(
         [f"{k}:\n{v}" for k, v in context.items()]
     )
 
-    prompt = f"""
+    return f"""
       You are an AI assistant helping a user explore project documents.
       You are given contextual excerpts from resources in a Neo4j database.
       Use them to answer the user's question truthfully.
@@ -118,9 +128,10 @@ async def generate_llm_response(user_query: str, context: dict):
       Respond concisely, citing which resources you used.
       """
 
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt
-    )
+async def generate_llm_response(user_query: str, context: dict):
+    return await generate_text(build_answer_prompt(user_query, context))
 
-    return response.candidates[0].content.parts[0].text
\ No newline at end of file
+async def stream_llm_response(user_query: str, context: dict):
+    """Same answer as generate_llm_response, yielded as text chunks while the model writes it."""
+    async for chunk in stream_text(build_answer_prompt(user_query, context)):
+        yield chunk
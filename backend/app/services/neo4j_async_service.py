@@ -0,0 +1,152 @@
+from app.services.neo4j_service import (
+    WRITE_RESOURCES_QUERY,
+    PROJECT_GRAPH_QUERY,
+    NEO4J_WRITE_BATCH_SIZE,
+    CYPHER_MAX_ROWS,
+    build_graph_payload,
+    resource_row,
+    project_record,
+    project_records,
+    cypher_response,
+)
+from app.services.providers import get_async_neo4j_driver, aclose_providers
+from app.services.project_versions import abump_project_version
+from app.services.cypher_params import prepare_cypher, plan_cache_stats
+from app.services.cypher_guard import guard_cypher, CYPHER_ROW_LIMIT, CYPHER_TX_TIMEOUT
+from neo4j import Query
+from neo4j.exceptions import ClientError, CypherSyntaxError
+
+# Same operations as neo4j_service on the AsyncGraphDatabase driver, for async
+# routes: Bolt round trips are awaited instead of blocking the event loop.
+# Pool size and acquisition timeout come from NEO4J_MAX_POOL_SIZE and
+# NEO4J_ACQUISITION_TIMEOUT (see providers.get_async_neo4j_driver).
+
+
+async def write_resources(tx, resources):
+    result = await tx.run(WRITE_RESOURCES_QUERY, resources=resources)
+    await result.consume()
+
+async def create_project(tx, project_id, project_name):
+    result = await tx.run(
+        "MERGE (p:Project {id: $id}) "
+        "SET p.name = $name",
+        id=str(project_id),
+        name=project_name
+    )
+    await result.consume()
+
+async def add_resource_with_concepts(resource_id, resource_name, project_id, concepts, uploaded_by=None):
+    row = resource_row(resource_id, resource_name, project_id, concepts, uploaded_by)
+    async with get_async_neo4j_driver().session() as session:
+        await session.execute_write(write_resources, [row])
+    await abump_project_version(project_id)
+
+async def add_resources_with_concepts(resources, project_id, uploaded_by=None):
+    rows = [
+        resource_row(resource["id"], resource["name"], project_id, resource["concepts"], uploaded_by)
+        for resource in resources
+    ]
+    async with get_async_neo4j_driver().session() as session:
+        for start in range(0, len(rows), NEO4J_WRITE_BATCH_SIZE):
+            await session.execute_write(write_resources, rows[start:start + NEO4J_WRITE_BATCH_SIZE])
+    await abump_project_version(project_id)
+
+async def add_resource_to_graph(resource_id, resource_name, project_id, uploaded_by=None):
+    await add_resource_with_concepts(resource_id, resource_name, project_id, [], uploaded_by)
+
+async def add_project_to_graph(project_id, project_name):
+    async with get_async_neo4j_driver().session() as session:
+        await session.execute_write(create_project, project_id, project_name)
+    await abump_project_version(project_id)
+
+async def fetch_project_graph(project_id: str):
+    async with get_async_neo4j_driver().session() as session:
+        result = await session.run(PROJECT_GRAPH_QUERY, project_id=project_id)
+        record = await result.single()
+
+    if not record:
+        return {"nodes": [], "links": []}
+    return build_graph_payload(record["project_id"], record["resources"])
+
+async def get_project_graph(project_id: str):
+    try:
+        return await fetch_project_graph(project_id)
+    except Exception as e:
+        print("Error fetching graph:", e)
+        return {"nodes": [], "links": []}
+
+async def _open_query(session, query: str, params: dict, guard: bool, row_limit):
+    """Returns (result, rejection reasons); result is None when the guard rejected the query."""
+    if guard:
+        query, reasons = await guard_cypher(session, query, params, row_limit)
+        if reasons:
+            return None, reasons
+    return await session.run(Query(query, timeout=CYPHER_TX_TIMEOUT), params), []
+
+async def _fetch(session, query: str, params: dict, guard: bool, max_rows: int):
+    result, reasons = await _open_query(session, query, params, guard, CYPHER_ROW_LIMIT)
+    records = await result.fetch(max_rows + 1) if result else []
+    return records, reasons
+
+def _fallback_applies(error: ClientError) -> bool:
+    # Only statement errors can come from a literal that can't be a parameter where
+    # it stands; a timeout or a security error would just happen again
+    return isinstance(error, CypherSyntaxError) or (error.code or "").startswith("Neo.ClientError.Statement.")
+
+async def _run_prepared(run, cypher_query: str, params: dict | None):
+    """
+    await run(query, params) on the normalised query; if Neo4j rejects the
+    parameterised statement, run the query as written (without params) instead.
+    """
+    query, params, normalised = prepare_cypher(cypher_query, params)
+    try:
+        return await run(query, params)
+    except ClientError as e:
+        if not normalised or not _fallback_applies(e):
+            raise
+        print("Parameterised Cypher failed, running as-is:", e)
+        plan_cache_stats.record_fallback()
+        return await run(cypher_query, {})
+
+async def run_cypher_query(cypher_query: str, params: dict | None = None, guard: bool = False,
+                           max_rows: int = CYPHER_MAX_ROWS):
+    """
+    Run a read query with a server-side timeout, keeping at most max_rows projected
+    rows. With guard=True (LLM-written Cypher) the query is bounded and EXPLAINed
+    first, and rejected if its plan is too costly.
+    """
+    async with get_async_neo4j_driver().session() as session:
+        records, reasons = await _run_prepared(
+            lambda query, params: _fetch(session, query, params, guard, max_rows), cypher_query, params)
+
+    if reasons:
+        print("Cypher rejected by cost guard:", reasons)
+        return {
+            "message": "Query rejected by cost guard.",
+            "cypher_query": cypher_query,
+            "results": [],
+            "truncated": False,
+            "rejected_reasons": reasons
+        }
+
+    rows = list(project_records(records[:max_rows]))
+    return cypher_response(cypher_query, rows, len(records) > max_rows)
+
+async def stream_cypher_query(cypher_query: str, params: dict | None = None, guard: bool = False):
+    """
+    Async generator over every projected row of a query, without the row cap (the
+    guard still bounds expansions and EXPLAINs, but adds no LIMIT). A rejected query
+    yields a single {"rejected_reasons": [...]} item.
+    """
+    async with get_async_neo4j_driver().session() as session:
+        result, reasons = await _run_prepared(
+            lambda query, params: _open_query(session, query, params, guard, None), cypher_query, params)
+
+        if reasons:
+            yield {"rejected_reasons": reasons}
+            return
+        async for record in result:
+            yield project_record(record)
+
+async def close_driver():
+    await aclose_providers()
@@ -0,0 +1,119 @@
+import argparse
+import sys
+from app.services.providers import get_neo4j_driver
+from app.services.neo4j_service import WRITE_RESOURCES_QUERY, PROJECT_GRAPH_QUERY
+
+CONCEPT_NAME_INDEX = "concept_name_fulltext"
+RESOURCE_NAME_INDEX = "resource_name_fulltext"
+
+# Every MERGE/MATCH in neo4j_service keys on one of these properties. A
+# uniqueness constraint gives each key a backing range index, so the MERGEs
+# become index seeks instead of label scans and duplicate nodes can't appear.
+# All statements are idempotent (IF NOT EXISTS) and safe to run on every boot.
+SCHEMA_STATEMENTS = [
+    "CREATE CONSTRAINT project_id_unique IF NOT EXISTS FOR (p:Project) REQUIRE p.id IS UNIQUE",
+    "CREATE CONSTRAINT resource_id_unique IF NOT EXISTS FOR (r:Resource) REQUIRE r.id IS UNIQUE",
+    "CREATE CONSTRAINT concept_name_unique IF NOT EXISTS FOR (c:Concept) REQUIRE c.name IS UNIQUE",
+    "CREATE CONSTRAINT user_id_unique IF NOT EXISTS FOR (u:User) REQUIRE u.id IS UNIQUE",
+    # Concept ids are what the graph payload and the frontend address nodes by
+    "CREATE INDEX concept_id IF NOT EXISTS FOR (c:Concept) ON (c.id)",
+    # Name lookups in chat Cypher go through these (db.index.fulltext.queryNodes)
+    # instead of scanning every node with toLower(...) CONTAINS
+    f"CREATE FULLTEXT INDEX {CONCEPT_NAME_INDEX} IF NOT EXISTS FOR (c:Concept) ON EACH [c.name]",
+    f"CREATE FULLTEXT INDEX {RESOURCE_NAME_INDEX} IF NOT EXISTS FOR (r:Resource) ON EACH [r.name]",
+]
+
+# Hot queries whose plans must start from an index, with placeholder parameters
+# (EXPLAIN only plans the query, nothing is read or written)
+HOT_QUERIES = {
+    "write_resources": (WRITE_RESOURCES_QUERY, {"resources": []}),
+    "project_graph": (PROJECT_GRAPH_QUERY, {"project_id": ""}),
+    "link_resource_to_concept": (
+        "MATCH (r:Resource {id: $resource_id}) "
+        "MERGE (c:Concept {name: $concept_name}) "
+        "MERGE (r)-[:COVERS]->(c)",
+        {"resource_id": "", "concept_name": ""},
+    ),
+    "create_project": ("MERGE (p:Project {id: $id}) SET p.name = $name", {"id": "", "name": ""}),
+    "concept_search": (
+        f"CALL db.index.fulltext.queryNodes('{CONCEPT_NAME_INDEX}', $search) YIELD node AS c, score "
+        "MATCH (p:Project {id: $project_id})-[:HAS_RESOURCE]->(r:Resource)-[:COVERS]->(c) "
+        "RETURN r, c, score ORDER BY score DESC",
+        {"search": "graph~", "project_id": ""},
+    ),
+}
+
+SCAN_OPERATORS = {"AllNodesScan", "NodeByLabelScan"}
+
+
+def ensure_schema(driver=None):
+    """Create the constraints and indexes that don't exist yet; returns the statements that failed."""
+    driver = driver or get_neo4j_driver()
+    failed = []
+    with driver.session() as session:
+        for statement in SCHEMA_STATEMENTS:
+            try:
+                session.run(statement).consume()
+            except Exception as e:
+                # e.g. existing duplicate nodes block a uniqueness constraint
+                print(f"Schema statement failed: {statement}\n  {e}")
+                failed.append(statement)
+    return failed
+
+
+def plan_operators(plan):
+    # Operator names carry a runtime suffix on Neo4j 5 ("NodeByLabelScan@neo4j")
+    yield plan["operatorType"].split("@")[0], plan.get("args", {})
+    for child in plan.get("children", []):
+        yield from plan_operators(child)
+
+
+def check_query_plans(driver=None):
+    """
+    EXPLAIN each hot query and return {query_name: [scan descriptions]} for
+    those whose plan still scans a label instead of seeking an index.
+    """
+    driver = driver or get_neo4j_driver()
+    problems = {}
+    with driver.session() as session:
+        for name, (query, params) in HOT_QUERIES.items():
+            plan = session.run("EXPLAIN " + query, params).consume().plan
+            scans = [
+                f"{operator} {args.get('Details', '')}".strip()
+                for operator, args in plan_operators(plan)
+                if operator in SCAN_OPERATORS
+            ]
+            if scans:
+                problems[name] = scans
+    return problems
+
+
+def bootstrap_schema(driver=None):
+    """Startup/CLI entry point: ensure the schema, then report hot queries that don't use it."""
+    try:
+        failed = ensure_schema(driver)
+        problems = check_query_plans(driver)
+    except Exception as e:
+        print("Neo4j schema bootstrap failed:", e)
+        return False
+
+    for name, scans in problems.items():
+        print(f"Query '{name}' does not use an index seek: {'; '.join(scans)}")
+    if not failed and not problems:
+        print("Neo4j schema OK: constraints and indexes in place, hot queries use index seeks")
+    return not failed and not problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create Neo4j constraints/indexes and check hot query plans")
+    parser.add_argument("--check-only", action="store_true", help="only EXPLAIN the hot queries")
+    args = parser.parse_args()
+
+    if args.check_only:
+        problems = check_query_plans()
+        for name, scans in problems.items():
+            print(f"Query '{name}' does not use an index seek: {'; '.join(scans)}")
+        ok = not problems
+    else:
+        ok = bootstrap_schema()
+    sys.exit(0 if ok else 1)
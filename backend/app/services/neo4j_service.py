@@ -1,10 +1,10 @@
-from neo4j import GraphDatabase
 from fastapi import HTTPException
 import os
 from dotenv import load_dotenv
-import spacy
-
-nlp = spacy.load("en_core_web_sm")
+from app.services.nlp_service import extract_concepts
+from app.services.providers import get_neo4j_driver, close_providers
+from app.services.project_versions import bump_project_version
+from neo4j.graph import Node, Relationship, Path
 
 load_dotenv()
 
@@ -13,22 +13,6 @@ NEO4J_USER = os.environ.get("NEO4J_USERNAME")
 NEO4J_PASSWORD = os.environ.get("NEO4J_PASSWORD")
 AUTH = (NEO4J_USER, NEO4J_PASSWORD)
 
-driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-
-def extract_concepts(text, limit=5):
-    doc = nlp(text)
-    concepts = set()
-
-    # Extract named entities
-    for ent in doc.ents:
-        concepts.add(ent.text)
-
-    # Extract noun chunks
-    for chunk in doc.noun_chunks:
-        concepts.add(chunk.text)
-
-    # Convert to list and take only the first `limit` concepts
-    return list(concepts)[:limit]
 
 def link_resource_to_concept(tx, resource_id, concept_name):
     tx.run("""
@@ -68,90 +52,160 @@ def create_resource(tx, resource_id, resource_name, project_id, uploaded_by=None
         """, id=resource_id, uploaded_by=uploaded_by)
     
 
+# One round trip per batch: resource, project link, uploader link and every
+# concept link. FOREACH keeps rows with no uploader/concepts from being dropped.
+WRITE_RESOURCES_QUERY = """
+UNWIND $resources AS res
+MERGE (r:Resource {id: res.id})
+SET r.name = res.name
+MERGE (p:Project {id: res.project_id})
+MERGE (p)-[:HAS_RESOURCE]->(r)
+FOREACH (uploader_id IN CASE WHEN res.uploaded_by IS NULL THEN [] ELSE [res.uploaded_by] END |
+    MERGE (u:User {id: uploader_id})
+    MERGE (r)-[:UPLOADED_BY]->(u)
+)
+FOREACH (concept_name IN res.concepts |
+    MERGE (c:Concept {name: concept_name})
+      ON CREATE SET c.id = randomUUID()
+    MERGE (r)-[:COVERS]->(c)
+)
+"""
+
+NEO4J_WRITE_BATCH_SIZE = int(os.environ.get("NEO4J_WRITE_BATCH_SIZE", 500))
+
+def write_resources(tx, resources):
+    tx.run(WRITE_RESOURCES_QUERY, resources=resources)
+
+def resource_row(resource_id, resource_name, project_id, concepts, uploaded_by=None):
+    return {
+        "id": str(resource_id),
+        "name": resource_name,
+        "project_id": str(project_id),
+        "uploaded_by": str(uploaded_by) if uploaded_by else None,
+        "concepts": list(concepts or []),
+    }
+
 def add_resource_with_concepts(resource_id, resource_name, project_id, concepts, uploaded_by=None):
     """
-    Service function: adds resource node and links concepts
+    Service function: adds resource node, its project/uploader links and concepts
+    in a single transaction
     """
-    with driver.session() as session:
-        # Add the resource node
-        session.execute_write(create_resource, resource_id, resource_name, project_id, uploaded_by)
-        
-        # Link concepts
-        for concept in concepts:
-            session.execute_write(link_resource_to_concept, resource_id, concept)
+    row = resource_row(resource_id, resource_name, project_id, concepts, uploaded_by)
+    with get_neo4j_driver().session() as session:
+        session.execute_write(write_resources, [row])
+    bump_project_version(project_id)
+
+def add_resources_with_concepts(resources, project_id, uploaded_by=None):
+    """
+    Bulk variant of add_resource_with_concepts for imports: `resources` is a list of
+    {"id", "name", "concepts"}, written NEO4J_WRITE_BATCH_SIZE per transaction
+    """
+    rows = [
+        resource_row(resource["id"], resource["name"], project_id, resource["concepts"], uploaded_by)
+        for resource in resources
+    ]
+    with get_neo4j_driver().session() as session:
+        for start in range(0, len(rows), NEO4J_WRITE_BATCH_SIZE):
+            session.execute_write(write_resources, rows[start:start + NEO4J_WRITE_BATCH_SIZE])
+    bump_project_version(project_id)
+
+# Aggregated on the server: one row per project, each resource once with its
+# distinct concepts, instead of one row per (resource, concept) pair.
+PROJECT_GRAPH_QUERY = """
+MATCH (p:Project {id: $project_id})
+OPTIONAL MATCH (p)-[:HAS_RESOURCE]->(res:Resource)
+OPTIONAL MATCH (res)-[:COVERS]->(c:Concept)
+WITH p, res, collect(DISTINCT c {.id, .name}) AS concepts
+RETURN p.id AS project_id, collect(res {.id, .name, concepts: concepts}) AS resources
+"""
+
+def build_graph_payload(project_id, resources):
+    """Single pass over the aggregated resources into deduplicated nodes and typed links"""
+    nodes = []
+    links = []
+    seen = set()
+
+    for res in resources:
+        if res["id"] not in seen:
+            seen.add(res["id"])
+            nodes.append({"id": res["id"], "label": res["name"], "group": "Resource"})
+        links.append({"source": project_id, "target": res["id"], "type": "HAS_RESOURCE"})
+
+        for c in res["concepts"]:
+            if c["id"] not in seen:
+                seen.add(c["id"])
+                nodes.append({"id": c["id"], "label": c["name"], "group": "Concept"})
+            links.append({"source": res["id"], "target": c["id"], "type": "COVERS"})
+
+    return {"nodes": nodes, "links": links}
+
+def fetch_project_graph(project_id: str):
+    with get_neo4j_driver().session() as session:
+        record = session.run(PROJECT_GRAPH_QUERY, project_id=project_id).single()
+
+    if not record:
+        return {"nodes": [], "links": []}
+    return build_graph_payload(record["project_id"], record["resources"])
 
 def get_project_graph(project_id: str):
     try:
-        with driver.session() as session:
-            result = session.run("""
-                MATCH (p:Project {id: $project_id})
-                OPTIONAL MATCH (p)-[r1:HAS_RESOURCE]->(res:Resource)
-                OPTIONAL MATCH (res)-[r2:COVERS]->(c:Concept)
-                RETURN p, r1, res, r2, c
-            """, project_id=project_id)
-            
-            nodes = {}
-            links = []
-
-            for record in result:
-                p = record["p"]
-                c = record["c"]
-                res = record["res"]
-
-                if c and res:
-                    links.append({"source": res["id"], "target": c["id"]})
-               
-                
-                # Add Resource node
-                res = record["res"]
-                if res:
-                    if res["id"] not in nodes:
-                        nodes[res["id"]] = {"id": res["id"], "label": res["name"], "group": "Resource"}
-                    # Add HAS_RESOURCE link
-                    r1 = record["r1"]
-                    if r1:
-                        links.append({"source": p["id"], "target": res["id"], "type": r1.type})
-                
-                # Add Concept node
-                c = record["c"]
-                #print(c)
-                if c:
-                    if c["id"] not in nodes:
-                        nodes[c["id"]] = {"id": c["id"], "label": c["name"], "group": "Concept"}
-                    # Add COVERS link
-                    r2 = record["r2"]
-                    if r2:
-                        links.append({"source": res["id"], "target": c["id"], "type": r2.type})
-
-            return {"nodes": list(nodes.values()), "links": links}
-
+        return fetch_project_graph(project_id)
     except Exception as e:
         print("Error fetching graph:", e)
         return {"nodes": [], "links": []}
     
-def run_cypher_query(cypher_query: str):
-    with driver.session() as session:
-        results = session.run(cypher_query)
-        data = [record.data() for record in results]
-
-        if not data:
-            return {
-                "message": "No data found for your query.",
-                "cypher_query": cypher_query,
-                "results": []
-            }
-        else:
-            return {
-                "results": data
-            }
+# Chat queries return at most this many rows; the rest is dropped and the
+# response is marked truncated. Use the NDJSON stream for full results.
+CYPHER_MAX_ROWS = int(os.environ.get("CYPHER_MAX_ROWS", 200))
+
+# What chat actually reads from a node: resource id/name, concept name
+_NODE_FIELDS = {"Resource": ("id", "name"), "Concept": ("name",)}
+
+def project_value(value):
+    """Reduce driver values to the fields chat uses, instead of every property."""
+    if isinstance(value, Node):
+        label = next((l for l in value.labels if l in _NODE_FIELDS), None)
+        fields = _NODE_FIELDS[label] if label else ("id", "name")
+        return {field: value.get(field) for field in fields if value.get(field) is not None}
+    if isinstance(value, Relationship):
+        return {"type": value.type}
+    if isinstance(value, Path):
+        return [project_value(node) for node in value.nodes]
+    if isinstance(value, list):
+        return [project_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: project_value(item) for key, item in value.items()}
+    return value
+
+def project_record(record):
+    return {key: project_value(value) for key, value in record.items()}
+
+def project_records(records):
+    """Lazily project records as they are consumed"""
+    for record in records:
+        yield project_record(record)
+
+def cypher_response(cypher_query: str, rows: list, truncated: bool):
+    if not rows:
+        return {
+            "message": "No data found for your query.",
+            "cypher_query": cypher_query,
+            "results": [],
+            "truncated": False
+        }
+    else:
+        return {
+            "results": rows,
+            "truncated": truncated
+        }
 
 def add_resource_to_graph(resource_id, resource_name, project_id, uploaded_by=None):
-    with driver.session() as session:
-        session.execute_write(create_resource, resource_id, resource_name, project_id, uploaded_by)
+    add_resource_with_concepts(resource_id, resource_name, project_id, [], uploaded_by)
 
 def add_project_to_graph(project_id, project_name):
-    with driver.session() as session:
+    with get_neo4j_driver().session() as session:
         session.execute_write(create_project, project_id, project_name)
+    bump_project_version(project_id)
 
 def close_driver():
-    driver.close() #only once after app closeS
+    close_providers() #only once after app closeS
@@ -0,0 +1,111 @@
+from collections import defaultdict, Counter
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+# Bulk imports batch documents through nlp.pipe; the throughput target is at least
+# 20 documents/second on one core (NLP_N_PROCESS=1) for ~5k-character documents.
+NLP_MODEL = os.environ.get("NLP_MODEL", "en_core_web_sm")
+NLP_BATCH_SIZE = int(os.environ.get("NLP_BATCH_SIZE", 32))
+NLP_N_PROCESS = int(os.environ.get("NLP_N_PROCESS", 1))
+NLP_CHUNK_CHARS = int(os.environ.get("NLP_CHUNK_CHARS", 100_000))
+
+# Entities and noun chunks need tok2vec, tagger, attribute_ruler, parser and ner;
+# nothing reads lemmas.
+NLP_EXCLUDE = ["lemmatizer"]
+
+# Entity labels that are numbers or dates rather than concepts
+IGNORED_ENTITY_LABELS = {"CARDINAL", "ORDINAL", "QUANTITY", "PERCENT", "MONEY", "DATE", "TIME"}
+ENTITY_WEIGHT = 2.0
+NOUN_CHUNK_WEIGHT = 1.0
+
+_nlp = None
+
+
+def get_nlp():
+    """Load the spaCy model on first use so process-pool workers only pay for it once."""
+    global _nlp
+    if _nlp is None:
+        # Imported here too: spaCy alone adds close to a second to app startup
+        import spacy
+        _nlp = spacy.load(NLP_MODEL, exclude=NLP_EXCLUDE)
+    return _nlp
+
+
+def split_text(text: str, max_chars: int = NLP_CHUNK_CHARS):
+    """Split text into chunks of at most `max_chars`, preferring paragraph then line breaks."""
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        if end < len(text):
+            for separator in ("\n\n", "\n", " "):
+                cut = text.rfind(separator, start, end)
+                if cut > start:
+                    end = cut + len(separator)
+                    break
+        chunks.append(text[start:end])
+        start = end
+    return chunks
+
+
+def _span_text(span) -> str:
+    # Drop leading determiners/pronouns so "the report" and "report" count together
+    tokens = list(span)
+    while tokens and (tokens[0].pos_ in ("DET", "PRON") or tokens[0].is_stop):
+        tokens = tokens[1:]
+    return " ".join(token.text for token in tokens).strip()
+
+
+class _ConceptScores:
+    def __init__(self):
+        self.scores = defaultdict(float)
+        self.forms = defaultdict(Counter)
+
+    def add(self, surface: str, weight: float, position: float):
+        if not surface or not any(ch.isalpha() for ch in surface):
+            return
+        key = surface.lower()
+        # Earlier mentions are more salient: weight decays to half by the end of the document
+        self.scores[key] += weight * (1.0 - 0.5 * position)
+        self.forms[key][surface] += 1
+
+    def top(self, limit: int):
+        ranked = sorted(self.scores, key=lambda key: (-self.scores[key], key))
+        return [self.forms[key].most_common(1)[0][0] for key in ranked[:limit]]
+
+
+def extract_concepts_batch(texts, limit=5, batch_size=NLP_BATCH_SIZE, n_process=NLP_N_PROCESS):
+    """
+    Extract the top `limit` concepts for each text. All texts are chunked and
+    streamed through `nlp.pipe` together; returns one concept list per text.
+    """
+    nlp = get_nlp()
+    max_chars = min(NLP_CHUNK_CHARS, nlp.max_length - 1)
+
+    def chunks():
+        for index, text in enumerate(texts):
+            offset = 0
+            for chunk in split_text(text or "", max_chars):
+                yield chunk, (index, offset)
+                offset += len(chunk)
+
+    scores = [_ConceptScores() for _ in texts]
+    lengths = [max(len(text or ""), 1) for text in texts]
+
+    for doc, (index, offset) in nlp.pipe(chunks(), as_tuples=True, batch_size=batch_size, n_process=n_process):
+        concept_scores = scores[index]
+
+        for ent in doc.ents:
+            if ent.label_ not in IGNORED_ENTITY_LABELS:
+                concept_scores.add(ent.text.strip(), ENTITY_WEIGHT, (offset + ent.start_char) / lengths[index])
+
+        for chunk in doc.noun_chunks:
+            concept_scores.add(_span_text(chunk), NOUN_CHUNK_WEIGHT, (offset + chunk.start_char) / lengths[index])
+
+    return [concept_scores.top(limit) for concept_scores in scores]
+
+
+def extract_concepts(text, limit=5):
+    return extract_concepts_batch([text], limit)[0]
@@ -0,0 +1,149 @@
+from dotenv import load_dotenv
+import pdfplumber
+import pypdfium2 as pdfium
+import docx
+import openpyxl
+import csv
+import os
+import io
+
+load_dotenv()
+
+# pdfplumber's layout analysis is only needed when word positions matter; plain
+# text through pdfium is several times faster and doesn't build layout objects.
+PDF_LAYOUT_TEXT = os.environ.get("PDF_LAYOUT_TEXT", "0") == "1"
+
+# Caps that keep a giant spreadsheet export from exhausting a worker
+SHEET_MAX_ROWS = int(os.environ.get("SHEET_MAX_ROWS", 100_000))
+SHEET_MAX_CELL_CHARS = int(os.environ.get("SHEET_MAX_CELL_CHARS", 1_000))
+
+SPREADSHEET_DELIMITERS = {"csv": ",", "tsv": "\t"}
+
+
+def pdf_page_count(source) -> int:
+    pdf = pdfium.PdfDocument(source)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def iter_pdf_pages(source, start: int = 0, end: int = None, layout: bool = PDF_LAYOUT_TEXT):
+    """
+    Yield the text of pages [start, end) one at a time. Each page's objects are
+    released as soon as its text has been read, so memory stays flat with page count.
+    """
+    if not layout:
+        pdf = pdfium.PdfDocument(source)
+        try:
+            end = len(pdf) if end is None else min(end, len(pdf))
+            for index in range(start, end):
+                page = pdf[index]
+                textpage = page.get_textpage()
+                try:
+                    yield textpage.get_text_bounded().replace("\r\n", "\n")
+                finally:
+                    textpage.close()
+                    page.close()
+        finally:
+            pdf.close()
+        return
+
+    with pdfplumber.open(source) as pdf:
+        end = len(pdf.pages) if end is None else min(end, len(pdf.pages))
+        for index in range(start, end):
+            page = pdf.pages[index]
+            try:
+                yield page.extract_text() or ""
+            finally:
+                # Drops the cached chars/layout objects pdfplumber keeps per page
+                page.close()
+
+
+def extract_pdf_range(source, start: int, end: int, layout: bool = PDF_LAYOUT_TEXT) -> str:
+    """Process-pool entry point for one slice of a page-parallel PDF extraction."""
+    return "\n".join(iter_pdf_pages(source, start, end, layout))
+
+
+def _row_text(row, max_cell_chars: int) -> str:
+    return " ".join(str(cell)[:max_cell_chars] for cell in row if cell is not None and cell != "")
+
+
+def iter_spreadsheet_rows(fileobj, file_ext: str, max_rows: int = SHEET_MAX_ROWS, max_cell_chars: int = SHEET_MAX_CELL_CHARS):
+    """
+    Yield one line of text per non-empty row of an xlsx, csv or tsv file. Rows
+    are streamed (openpyxl read-only mode, csv.reader) and at most `max_rows`
+    rows per sheet are read, each cell truncated to `max_cell_chars`. CSV rows
+    with a cell too large for the csv module to read are skipped.
+    """
+    if file_ext == "xlsx":
+        wb = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+        try:
+            for sheet in wb.worksheets:
+                for index, row in enumerate(sheet.iter_rows(values_only=True)):
+                    if index >= max_rows:
+                        break
+                    line = _row_text(row, max_cell_chars)
+                    if line:
+                        yield line
+        finally:
+            wb.close()
+        return
+
+    text = io.TextIOWrapper(fileobj, encoding="utf-8", errors="ignore", newline="")
+    try:
+        reader = csv.reader(text, delimiter=SPREADSHEET_DELIMITERS[file_ext])
+        for _ in range(max_rows):
+            try:
+                row = next(reader)
+            except StopIteration:
+                break
+            except csv.Error:
+                # A cell past csv.field_size_limit: the reader drops the rest of
+                # that row and carries on with the next one, so skip just this row
+                continue
+            line = _row_text(row, max_cell_chars)
+            if line:
+                yield line
+    finally:
+        # Leave the underlying binary file for the caller to close
+        text.detach()
+
+
+def extract_text(fileobj, file_name: str):
+    """
+    Parse text out of a binary file object. `file_name` is only used for its extension.
+    """
+    file_ext = file_name.split(".")[-1].lower()
+    content = ""
+
+    if file_ext == "pdf":
+        content = "\n".join(iter_pdf_pages(fileobj))
+
+    elif file_ext == "docx":
+        doc = docx.Document(fileobj)
+        content = "\n".join([p.text for p in doc.paragraphs])
+
+    elif file_ext == "xlsx" or file_ext in SPREADSHEET_DELIMITERS:
+        content = "\n".join(iter_spreadsheet_rows(fileobj, file_ext))
+
+    else:
+        try:
+            content = fileobj.read().decode("utf-8", errors="ignore")
+        except Exception:
+            content = ""
+
+    return content.strip()
+
+
+def parse_file(source, file_name: str):
+    """
+    Process-pool entry point: `source` is either raw bytes or a path on local disk.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        fileobj = io.BytesIO(source)
+    else:
+        fileobj = open(source, "rb")
+
+    with fileobj:
+        return extract_text(fileobj, file_name)
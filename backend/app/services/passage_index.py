@@ -0,0 +1,165 @@
+from collections import Counter
+from dotenv import load_dotenv
+import threading
+import tempfile
+import math
+import json
+import re
+import os
+from app.services.ingest_cache import write_json_atomic
+
+load_dotenv()
+
+PASSAGE_INDEX_DIR = os.environ.get("PASSAGE_INDEX_DIR") or os.path.join(tempfile.gettempdir(), "atlasmind-passages")
+# Passage size and overlap, in words
+PASSAGE_WORDS = int(os.environ.get("PASSAGE_WORDS", 150))
+PASSAGE_OVERLAP = int(os.environ.get("PASSAGE_OVERLAP", 30))
+# Passages put into an answer prompt, and the (estimated) tokens they may use together
+PASSAGE_TOP_K = int(os.environ.get("PASSAGE_TOP_K", 8))
+PASSAGE_TOKEN_BUDGET = int(os.environ.get("PASSAGE_TOKEN_BUDGET", 3000))
+
+# BM25 parameters
+_K1 = 1.2
+_B = 0.75
+
+_TERM = re.compile(r"\w+")
+_PARAGRAPH = re.compile(r"\n\s*\n")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from", "how",
+    "i", "in", "is", "it", "of", "on", "or", "that", "the", "this", "to", "was", "what", "when",
+    "where", "which", "who", "why", "with", "about", "me", "my", "tell", "explain",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English text
+    return max(1, len(text) // 4)
+
+
+def terms(text: str) -> list[str]:
+    return [t for t in _TERM.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def chunk_text(text: str, words: int = PASSAGE_WORDS, overlap: int = PASSAGE_OVERLAP) -> list[str]:
+    """
+    Split text into passages of about `words` words. Paragraphs are packed
+    together while they fit; a paragraph longer than a passage is cut into
+    windows that overlap by `overlap` words so no sentence is only seen cut.
+    """
+    passages, current = [], []
+    step = max(1, words - overlap)
+    for paragraph in _PARAGRAPH.split(text or ""):
+        tokens = paragraph.split()
+        if not tokens:
+            continue
+        if current and len(current) + len(tokens) > words:
+            passages.append(" ".join(current))
+            current = []
+        if len(tokens) <= words:
+            current.extend(tokens)
+            continue
+        for start in range(0, len(tokens), step):
+            passages.append(" ".join(tokens[start:start + words]))
+            if start + words >= len(tokens):
+                break
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+class PassageIndex:
+    """
+    Per-project passage index on local disk: each resource's parsed text is
+    chunked at ingest into passages stored with their term frequencies, and at
+    chat time the passages of the matched resources are ranked with BM25 against
+    the question, so only the best few go into the answer prompt.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self.indexed = 0
+        self.selections = 0
+
+    def _path(self, project_id: str, resource_id: str) -> str:
+        return os.path.join(self.directory, str(project_id), f"{resource_id}.json")
+
+    def has(self, project_id: str, resource_id: str) -> bool:
+        return os.path.exists(self._path(project_id, resource_id))
+
+    def missing(self, project_id: str, resource_ids) -> list[str]:
+        return [str(rid) for rid in dict.fromkeys(resource_ids) if not self.has(project_id, rid)]
+
+    def index_resource(self, project_id: str, resource_id: str, text: str | None) -> int:
+        """Chunk and store one resource's text. Returns the number of passages."""
+        passages = []
+        for passage in chunk_text(text or ""):
+            passage_terms = terms(passage)
+            passages.append({"text": passage, "tf": Counter(passage_terms), "length": len(passage_terms)})
+        write_json_atomic(self._path(project_id, resource_id), {"resource_id": str(resource_id), "passages": passages})
+
+        with self._lock:
+            self.indexed += 1
+        return len(passages)
+
+    def _load(self, project_id: str, resource_id: str) -> list[dict]:
+        try:
+            with open(self._path(project_id, resource_id), "r", encoding="utf-8") as f:
+                return json.load(f)["passages"]
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def select(self, project_id: str, resource_ids, query: str,
+               top_k: int = PASSAGE_TOP_K, token_budget: int = PASSAGE_TOKEN_BUDGET) -> list[dict]:
+        """
+        The best passages of the given resources for `query`, best first: at most
+        `top_k` of them, within `token_budget` estimated tokens. IDF is computed
+        over the candidates' passages, so terms common to every matched resource
+        count for little. Returns [{"resource_id", "position", "text", "score"}].
+        """
+        candidates = []
+        for rid in dict.fromkeys(str(rid) for rid in resource_ids):
+            for position, passage in enumerate(self._load(project_id, rid)):
+                candidates.append((rid, position, passage))
+        if not candidates:
+            return []
+
+        query_terms = set(terms(query))
+        count = len(candidates)
+        average_length = sum(p["length"] for _, _, p in candidates) / count or 1
+        document_frequency = Counter(t for _, _, p in candidates for t in query_terms if t in p["tf"])
+
+        scored = []
+        for rid, position, passage in candidates:
+            score = 0.0
+            norm = _K1 * (1 - _B + _B * passage["length"] / average_length)
+            for term in query_terms:
+                tf = passage["tf"].get(term, 0)
+                if tf:
+                    df = document_frequency[term]
+                    idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                    score += idf * tf * (_K1 + 1) / (tf + norm)
+            # Ties (e.g. no query term anywhere) favour the start of each resource
+            scored.append((-score, position, rid, passage["text"]))
+        scored.sort()
+
+        selected, used = [], 0
+        for negative_score, position, rid, text in scored:
+            if len(selected) >= top_k:
+                break
+            tokens = estimate_tokens(text)
+            if used + tokens > token_budget:
+                continue
+            selected.append({"resource_id": rid, "position": position, "text": text, "score": round(-negative_score, 4)})
+            used += tokens
+
+        with self._lock:
+            self.selections += 1
+        return selected
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"indexed": self.indexed, "selections": self.selections}
+
+
+passage_index = PassageIndex(PASSAGE_INDEX_DIR)
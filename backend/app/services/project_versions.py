@@ -0,0 +1,105 @@
+from dotenv import load_dotenv
+import threading
+import uuid
+import sys
+import os
+from redis.exceptions import RedisError
+from app.services.providers import get_redis, get_async_redis
+
+load_dotenv()
+
+# With more than one uvicorn worker, versions must live in Redis so a write
+# handled by one worker invalidates snapshots cached by the others. Caches
+# shared through Redis are keyed by version, so turning one on turns this on
+# too; with per-process versions no two workers would ever build the same key.
+PROJECT_VERSIONS_REDIS = (
+    os.environ.get("PROJECT_VERSIONS_REDIS", "0") == "1"
+    or os.environ.get("GRAPH_CACHE_REDIS", "0") == "1"
+    or os.environ.get("ANSWER_CACHE_REDIS", "0") == "1"
+)
+
+# In-memory counters restart at zero with the process; the boot ID keeps a
+# version from one run from colliding with the same number from another.
+_BOOT_ID = uuid.uuid4().hex[:8]
+_versions = {}
+_lock = threading.Lock()
+
+
+def _key(project_id: str) -> str:
+    return f"project_version:{project_id}"
+
+
+def _local_version(project_id: str, bump: bool = False) -> str:
+    with _lock:
+        if bump:
+            _versions[project_id] = _versions.get(project_id, 0) + 1
+        return f"{_BOOT_ID}.{_versions.get(project_id, 0)}"
+
+
+def get_project_version(project_id: str) -> str:
+    """Current content version of a project; changes on every graph write to it."""
+    project_id = str(project_id)
+    if PROJECT_VERSIONS_REDIS:
+        version = get_redis().get(_key(project_id))
+        return version.decode() if version else "0"
+    return _local_version(project_id)
+
+
+def bump_project_version(project_id: str) -> str:
+    project_id = str(project_id)
+    if PROJECT_VERSIONS_REDIS:
+        return str(get_redis().incr(_key(project_id)))
+    return _local_version(project_id, bump=True)
+
+
+# Async counterparts for code on the event loop. Redis failures don't raise:
+# callers get None and treat it as "version unknown" (don't cache).
+
+async def aget_project_version(project_id: str) -> str | None:
+    project_id = str(project_id)
+    if not PROJECT_VERSIONS_REDIS:
+        return _local_version(project_id)
+    try:
+        version = await get_async_redis().get(_key(project_id))
+    except (RedisError, OSError) as e:
+        print(f"⚠️ Project version unavailable for {project_id}: {e}")
+        return None
+    return version.decode() if version else "0"
+
+
+async def abump_project_version(project_id: str) -> str | None:
+    project_id = str(project_id)
+    if not PROJECT_VERSIONS_REDIS:
+        return _local_version(project_id, bump=True)
+    try:
+        return str(await get_async_redis().incr(_key(project_id)))
+    except (RedisError, OSError) as e:
+        # The graph write itself succeeded; caches keyed by the old version
+        # go stale until they expire
+        print(f"⚠️ Could not bump project version for {project_id}: {e}")
+        return None
+
+
+def _configured_workers() -> int:
+    # uvicorn/gunicorn take --workers/-w, and both default to WEB_CONCURRENCY
+    workers = os.environ.get("WEB_CONCURRENCY")
+    for i, arg in enumerate(sys.argv):
+        if arg in ("--workers", "-w") and i + 1 < len(sys.argv):
+            workers = sys.argv[i + 1]
+        elif arg.startswith("--workers="):
+            workers = arg.split("=", 1)[1]
+    try:
+        return int(workers or 1)
+    except ValueError:
+        return 1
+
+
+def check_version_backend():
+    """Warn at startup when several workers would each keep their own project versions."""
+    workers = _configured_workers()
+    if workers > 1 and not PROJECT_VERSIONS_REDIS:
+        print(
+            f"⚠️ ⚠️ ⚠️ Running {workers} workers with in-memory project versions: a worker that "
+            "didn't handle an ingest keeps serving the project's old graph snapshots and cached "
+            "answers. Set PROJECT_VERSIONS_REDIS=1 (or GRAPH_CACHE_REDIS=1 / ANSWER_CACHE_REDIS=1)."
+        )
@@ -1,17 +1,16 @@
-from supabase import create_client
 from dotenv import load_dotenv
 import os
+from app.services.providers import get_supabase
 
 load_dotenv()
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 def get_project_context(project_id: str) -> dict:
     """
     Fetch project context like doc_id, sheet_id, and other metadata.
     """
-    response = supabase.table("Projects").select("*").eq("id", project_id).execute()
+    response = get_supabase().table("Projects").select("*").eq("id", project_id).execute()
     data = response.data
     if not data:
         return None
@@ -26,18 +25,42 @@ def get_project_context(project_id: str) -> dict:
     }
     return context #return context
 
-def get_resource_text(resource_id: str):
-    response = supabase.table("Resources").select("*").eq("id", resource_id).execute()
-    data = response.data
-    print("data:", response)
-    if not data:
-        return None
-    
-    text = data[0]
+def get_resource_texts(resource_ids) -> dict:
+    """
+    Parsed text for many resources in one round trip: {resource_id: {"resource_id",
+    "parsed_text"}} for the ids that exist. Only the columns we need are selected.
+    """
+    ids = list(dict.fromkeys(str(rid) for rid in resource_ids if rid))
+    if not ids:
+        return {}
 
-    parsed_text = {
-        "resource_id": resource_id,
-        "parsed_text": text.get("parsed_text")
+    response = get_supabase().table("Resources").select("id, parsed_text").in_("id", ids).execute()
+    return {
+        str(row["id"]): {"resource_id": str(row["id"]), "parsed_text": row.get("parsed_text")}
+        for row in response.data or []
     }
 
-    return parsed_text
\ No newline at end of file
+def get_resource_text(resource_id: str):
+    return get_resource_texts([resource_id]).get(str(resource_id))
+
+
+class ResourceTextLoader:
+    """
+    Per-request memo in front of get_resource_texts: ids already loaded (or
+    known to be missing) in this request are not fetched again.
+    """
+
+    def __init__(self):
+        self._texts = {}
+
+    def load_many(self, resource_ids) -> dict:
+        ids = [str(rid) for rid in resource_ids if rid]
+        missing = [rid for rid in dict.fromkeys(ids) if rid not in self._texts]
+        if missing:
+            found = get_resource_texts(missing)
+            for rid in missing:
+                self._texts[rid] = found.get(rid)
+        return {rid: self._texts[rid] for rid in ids}
+
+    def get(self, resource_id):
+        return self.load_many([resource_id]).get(str(resource_id))
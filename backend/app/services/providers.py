@@ -0,0 +1,135 @@
+from dotenv import load_dotenv
+import functools
+import threading
+import os
+
+load_dotenv()
+
+# Heavy clients are created on first use and shared afterwards, so importing
+# app.main (and serving routes that never touch them) stays cheap. The client
+# libraries themselves are imported inside the factories for the same reason.
+
+_providers = {}
+
+
+def provider(factory):
+    """Turn a zero-argument factory into a thread-safe, lazily created singleton getter."""
+    lock = threading.Lock()
+    instance = []
+
+    @functools.wraps(factory)
+    def get():
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+
+    get.created = lambda: bool(instance)
+    get.reset = instance.clear
+    _providers[factory.__name__] = get
+    return get
+
+
+def resolve_creds_path(var_name: str = "GOOGLE_CREDS_JSON") -> str:
+    creds_path_var = os.environ.get(var_name)
+    if not creds_path_var:
+        raise ValueError(f"{var_name} environment variable not set")
+
+    # Relative paths resolve from a subpackage directory of app/, as they did
+    # when app/routes and app/workflows each resolved them from their own folder
+    base_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "routes")
+    return os.path.join(base_dir, creds_path_var)
+
+
+@provider
+def get_supabase():
+    from supabase import create_client
+    return create_client(os.environ.get("SUPABASE_URL"), os.environ.get("SUPABASE_KEY"))
+
+
+@provider
+def get_genai_client():
+    from google import genai
+    return genai.Client()
+
+
+@provider
+def get_neo4j_driver():
+    from neo4j import GraphDatabase
+    return GraphDatabase.driver(
+        os.environ.get("NEO4J_URI"),
+        auth=(os.environ.get("NEO4J_USERNAME"), os.environ.get("NEO4J_PASSWORD")),
+    )
+
+
+@provider
+def get_async_neo4j_driver():
+    # Only use from async code running on the app's event loop
+    from neo4j import AsyncGraphDatabase
+    return AsyncGraphDatabase.driver(
+        os.environ.get("NEO4J_URI"),
+        auth=(os.environ.get("NEO4J_USERNAME"), os.environ.get("NEO4J_PASSWORD")),
+        max_connection_pool_size=int(os.environ.get("NEO4J_MAX_POOL_SIZE", 100)),
+        connection_acquisition_timeout=float(os.environ.get("NEO4J_ACQUISITION_TIMEOUT", 60)),
+    )
+
+
+def _redis_options() -> dict:
+    # Caches and versions sit on the request path: a slow or unreachable Redis
+    # must fail fast so callers can fall back instead of hanging
+    timeout = float(os.environ.get("REDIS_SOCKET_TIMEOUT", 1))
+    return {
+        "host": os.environ.get("REDIS_HOST", "localhost"),
+        "port": int(os.environ.get("REDIS_PORT", 6379)),
+        "socket_timeout": timeout,
+        "socket_connect_timeout": timeout,
+    }
+
+
+@provider
+def get_redis():
+    import redis
+    return redis.Redis(**_redis_options())
+
+
+@provider
+def get_async_redis():
+    # Only use from async code running on the app's event loop
+    import redis.asyncio as aioredis
+    return aioredis.Redis(**_redis_options())
+
+
+@provider
+def get_google_agent():
+    from app.agents.google_agent import GoogleAgent
+    return GoogleAgent(creds_json_path=resolve_creds_path())
+
+
+@provider
+def get_mail_agent():
+    from app.agents.mail_agent import MailAgent
+    # SMTP credentials (ProtonMail via Bridge or any SMTP server)
+    return MailAgent(
+        smtp_host=os.environ.get("SMTP_HOST"),
+        smtp_port=int(os.environ.get("SMTP_PORT", 465)),
+        email=os.environ.get("SMTP_EMAIL"),
+        password=os.environ.get("SMTP_PASSWORD"),
+    )
+
+
+def close_providers():
+    """Release clients that hold sockets; called on app shutdown."""
+    if get_neo4j_driver.created():
+        get_neo4j_driver().close()
+        get_neo4j_driver.reset()
+
+
+async def aclose_providers():
+    """Async counterpart of close_providers for clients bound to the event loop."""
+    if get_async_neo4j_driver.created():
+        await get_async_neo4j_driver().close()
+        get_async_neo4j_driver.reset()
+    if get_async_redis.created():
+        await get_async_redis().aclose()
+        get_async_redis.reset()
@@ -0,0 +1,109 @@
+from fastapi import UploadFile
+from dotenv import load_dotenv
+import hashlib
+import tempfile
+import os
+import io
+
+load_dotenv()
+
+UPLOAD_CHUNK_SIZE = int(os.environ.get("UPLOAD_CHUNK_SIZE", 1024 * 1024))
+UPLOAD_SPOOL_MAX_MEMORY = int(os.environ.get("UPLOAD_SPOOL_MAX_MEMORY", 8 * 1024 * 1024))
+UPLOAD_SPOOL_DIR = os.environ.get("UPLOAD_SPOOL_DIR") or None
+
+
+class SpooledUpload:
+    """
+    An upload written to a bounded spool: small files stay in memory, anything
+    larger than `max_memory` rolls over to a named temp file on disk. The SHA-256
+    is computed while the chunks are written, so the bytes are only walked once.
+    """
+
+    def __init__(self, filename: str, content_type: str = None, max_memory: int = UPLOAD_SPOOL_MAX_MEMORY):
+        self.filename = filename
+        self.content_type = content_type
+        self.max_memory = max_memory
+        self.size = 0
+        self.path = None
+        self._hash = hashlib.sha256()
+        self._file = io.BytesIO()
+
+    @property
+    def extension(self) -> str:
+        return self.filename.split(".")[-1].lower()
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    @property
+    def in_memory(self) -> bool:
+        return self.path is None
+
+    def write(self, chunk: bytes):
+        self._hash.update(chunk)
+        self.size += len(chunk)
+        if self.in_memory and self.size > self.max_memory:
+            self._rollover()
+        self._file.write(chunk)
+
+    def _rollover(self):
+        tmp = tempfile.NamedTemporaryFile(prefix="atlasmind-upload-", dir=UPLOAD_SPOOL_DIR, delete=False)
+        tmp.write(self._file.getvalue())
+        self._file = tmp
+        self.path = tmp.name
+
+    def finish(self):
+        """Flush pending writes so the spool can be re-read."""
+        self._file.flush()
+
+    def getvalue(self) -> bytes:
+        """Raw bytes of an in-memory spool (bounded by `max_memory`)."""
+        if not self.in_memory:
+            raise ValueError("Upload was spooled to disk, use open() instead")
+        return self._file.getvalue()
+
+    def open(self):
+        """Return a fresh binary reader positioned at the start of the upload."""
+        if self.in_memory:
+            return io.BytesIO(self._file.getvalue())
+        return open(self.path, "rb")
+
+    def storage_body(self):
+        """
+        Body for the Supabase storage client: bytes for in-memory spools, an open
+        file for on-disk ones so httpx streams it in chunks. Close what you get back.
+        """
+        if self.in_memory:
+            return self.getvalue()
+        return self.open()
+
+    def close(self):
+        self._file.close()
+        if self.path and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def spool_upload(file: UploadFile, chunk_size: int = UPLOAD_CHUNK_SIZE) -> SpooledUpload:
+    """
+    Copy an UploadFile into a SpooledUpload chunk by chunk, hashing as it goes.
+    Peak memory stays at one chunk plus the in-memory spool limit.
+    """
+    upload = SpooledUpload(file.filename, file.content_type)
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+            upload.write(chunk)
+        upload.finish()
+    except Exception:
+        upload.close()
+        raise
+    return upload
@@ -0,0 +1,120 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dotenv import load_dotenv
+import functools
+import threading
+import asyncio
+import weakref
+import os
+
+load_dotenv()
+
+PARSE_POOL_WORKERS = int(os.environ.get("PARSE_POOL_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+PARSE_JOB_TIMEOUT = float(os.environ.get("PARSE_JOB_TIMEOUT", 300))
+PARSE_POOL_MAX_TASKS_PER_CHILD = int(os.environ.get("PARSE_POOL_MAX_TASKS_PER_CHILD", 50))
+
+
+class ProcessPool:
+    """
+    Lazily created ProcessPoolExecutor for CPU-bound parsing and NLP.
+
+    - Workers are recycled after `max_tasks_per_child` jobs to bound memory
+      (pdfplumber and spaCy both grow over time).
+    - A job that exceeds its timeout retires its pool: new jobs go to a fresh
+      pool, the other jobs already running in the retired one finish normally,
+      and its workers (including the stuck one) are terminated once none of
+      them is still awaited. A worker can't be killed on its own without
+      breaking every job in its executor, hence the hand-over.
+    - At most `workers` jobs are handed to the executor at a time; the rest
+      wait their turn here, so the timeout only counts a job's own run time.
+    """
+
+    def __init__(self, workers: int, timeout: float, max_tasks_per_child: int = None):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_tasks_per_child = max_tasks_per_child or None
+        self._executor = None
+        # Jobs still awaited per executor, and executors that take no new jobs
+        self._pending = {}
+        self._retired = set()
+        # One slot per worker, per event loop (asyncio primitives are loop-bound)
+        self._slots = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _acquire_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    max_tasks_per_child=self.max_tasks_per_child,
+                )
+                self._pending[self._executor] = 0
+            self._pending[self._executor] += 1
+            return self._executor
+
+    @staticmethod
+    def _terminate(executor):
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, executor, retire: bool = False):
+        """Stop awaiting one job of `executor`; terminate it once it's retired and idle."""
+        with self._lock:
+            self._pending[executor] -= 1
+            if retire:
+                self._retired.add(executor)
+                if self._executor is executor:
+                    self._executor = None
+            done = executor in self._retired and self._pending[executor] == 0
+            if done:
+                self._retired.discard(executor)
+                del self._pending[executor]
+        if done:
+            self._terminate(executor)
+
+    async def run(self, fn, *args, timeout: float = None, **kwargs):
+        """Run `fn(*args, **kwargs)` in a worker process without blocking the event loop."""
+        timeout = timeout or self.timeout
+        loop = asyncio.get_running_loop()
+        if loop not in self._slots:
+            self._slots[loop] = asyncio.Semaphore(self.workers)
+
+        async with self._slots[loop]:
+            executor = self._acquire_executor()
+            retire = False
+            try:
+                future = asyncio.wrap_future(executor.submit(functools.partial(fn, *args, **kwargs)))
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                retire = True
+                raise TimeoutError(f"{fn.__name__} did not finish within {timeout}s")
+            except BrokenProcessPool:
+                retire = True
+                raise
+            finally:
+                self._release(executor, retire)
+
+    def shutdown(self):
+        with self._lock:
+            executors = set(self._pending)
+            self._executor = None
+            self._pending.clear()
+            self._retired.clear()
+        for executor in executors:
+            self._terminate(executor)
+
+
+parse_pool = ProcessPool(
+    workers=PARSE_POOL_WORKERS,
+    timeout=PARSE_JOB_TIMEOUT,
+    max_tasks_per_child=PARSE_POOL_MAX_TASKS_PER_CHILD,
+)
+
+
+async def run_in_pool(fn, *args, **kwargs):
+    return await parse_pool.run(fn, *args, **kwargs)
+
+
+def shutdown_pool():
+    parse_pool.shutdown()
@@ -1,17 +1,7 @@
-import os
 from langgraph.graph import StateGraph, END
 from typing import TypedDict
-from app.agents.google_agent import GoogleAgent
 from app.services.projects_service import get_project_context
-
-creds_path_var = os.environ.get("GOOGLE_CREDS_JSON")
-if not creds_path_var:
-    raise ValueError("GOOGLE_CREDS_JSON environment variable not set")
-
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-creds_path = os.path.join(BASE_DIR, creds_path_var)
-
-google_agent = GoogleAgent(creds_json_path=creds_path)
+from app.services.providers import get_google_agent
 
 class WorkflowState(TypedDict):
     project_id: str
@@ -26,9 +16,9 @@ def fetch_context_node(state: WorkflowState) -> WorkflowState:
         raise ValueError(f"No project found with id {state['project_id']}")
     return {"context": context}
 
-def run_agent_node(state: WorkflowState) -> WorkflowState:
+async def run_agent_node(state: WorkflowState) -> WorkflowState:
     """Run the Google agent with context and prompt"""
-    result = google_agent.run(
+    result = await get_google_agent().run(
         project_id=state["project_id"],
         context=state["context"],
         prompt=state["prompt"]
@@ -47,9 +37,9 @@ workflow.set_entry_point("fetch_context")
 
 app = workflow.compile()
 
-def run_google_doc_workflow(project_id: str, prompt: str):
+async def run_google_doc_workflow(project_id: str, prompt: str):
     """Execute the workflow"""
-    return app.invoke({
+    return await app.ainvoke({
         "project_id": project_id,
         "prompt": prompt
     })
\ No newline at end of file
@@ -1,22 +1,8 @@
 # app/workflows/mail_workflow.py
-import os
 from langgraph.graph import StateGraph, END
 from typing import TypedDict
-from app.agents.mail_agent import MailAgent
 from app.services.projects_service import get_project_context
-
-# SMTP credentials (ProtonMail via Bridge or any SMTP server)
-SMTP_HOST = os.environ.get("SMTP_HOST")
-SMTP_PORT = int(os.environ.get("SMTP_PORT", 465))
-SMTP_EMAIL = os.environ.get("SMTP_EMAIL")
-SMTP_PASSWORD = os.environ.get("SMTP_PASSWORD")
-
-mail_agent = MailAgent(
-    smtp_host=SMTP_HOST,
-    smtp_port=SMTP_PORT,
-    email=SMTP_EMAIL,
-    password=SMTP_PASSWORD
-)
+from app.services.providers import get_mail_agent
 
 class WorkflowState(TypedDict, total=False):
     project_id: str
@@ -32,8 +18,8 @@ def fetch_context_node(state: WorkflowState) -> WorkflowState:
     state["context"] = context
     return state
 
-def run_mail_agent_node(state: WorkflowState) -> WorkflowState:
-    result = mail_agent.run(
+async def run_mail_agent_node(state: WorkflowState) -> WorkflowState:
+    result = await get_mail_agent().run(
         project_id=state["project_id"],
         context=state["context"],
         prompt=state["prompt"],
@@ -50,5 +36,5 @@ workflow.add_edge("run_agent", END)
 workflow.set_entry_point("fetch_context")
 app = workflow.compile()
 
-def run_mail_workflow(project_id: str, prompt: str, recipient: str):
-    return app.invoke({"project_id": project_id, "prompt": prompt, "recipient": recipient})
+async def run_mail_workflow(project_id: str, prompt: str, recipient: str):
+    return await app.ainvoke({"project_id": project_id, "prompt": prompt, "recipient": recipient})
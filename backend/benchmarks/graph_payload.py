@@ -0,0 +1,81 @@
+"""
+Project graph payload: the old per-(resource, concept) row builder against the
+server-aggregated build_graph_payload, on a synthetic project.
+
+Run from backend/:  python -m benchmarks.graph_payload [--resources 2000 --concepts-per-resource 5]
+"""
+from types import SimpleNamespace
+import argparse
+import random
+import json
+import time
+from app.services.neo4j_service import build_graph_payload
+
+
+def legacy_build_graph_payload(records):
+    """get_project_graph's record loop before the query was aggregated (one row per pair)."""
+    nodes = {}
+    links = []
+    for record in records:
+        p, c, res = record["p"], record["c"], record["res"]
+        if c and res:
+            links.append({"source": res["id"], "target": c["id"]})
+        if res:
+            if res["id"] not in nodes:
+                nodes[res["id"]] = {"id": res["id"], "label": res["name"], "group": "Resource"}
+            if record["r1"]:
+                links.append({"source": p["id"], "target": res["id"], "type": record["r1"].type})
+        if c:
+            if c["id"] not in nodes:
+                nodes[c["id"]] = {"id": c["id"], "label": c["name"], "group": "Concept"}
+            if record["r2"]:
+                links.append({"source": res["id"], "target": c["id"], "type": record["r2"].type})
+    return {"nodes": list(nodes.values()), "links": links}
+
+
+def synthetic_project(resources: int, per_resource: int, concept_pool: int, seed: int = 7):
+    """The same graph as the old query's rows and as the aggregated query's resources."""
+    rng = random.Random(seed)
+    concepts = [{"id": f"c{i}", "name": f"concept {i}"} for i in range(concept_pool)]
+    project = {"id": "project-1"}
+    has_resource, covers = SimpleNamespace(type="HAS_RESOURCE"), SimpleNamespace(type="COVERS")
+
+    rows, aggregated = [], []
+    for r in range(resources):
+        res = {"id": f"r{r}", "name": f"resource {r}.pdf"}
+        chosen = rng.sample(concepts, per_resource)
+        rows.extend({"p": project, "r1": has_resource, "res": res, "r2": covers, "c": c} for c in chosen)
+        aggregated.append({**res, "concepts": chosen})
+    return rows, aggregated
+
+
+def _best_of(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resources", type=int, default=2000)
+    parser.add_argument("--concepts-per-resource", type=int, default=5)
+    parser.add_argument("--concept-pool", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows, aggregated = synthetic_project(args.resources, args.concepts_per_resource, args.concept_pool)
+    old_time, old = _best_of(lambda: legacy_build_graph_payload(rows), args.repeat)
+    new_time, new = _best_of(lambda: build_graph_payload("project-1", aggregated), args.repeat)
+
+    print(f"{args.resources} resources x {args.concepts_per_resource} concepts ({args.concept_pool} distinct concepts)")
+    print(f"{'':>12} {'rows':>8} {'build ms':>9} {'nodes':>7} {'links':>7} {'payload KB':>11}")
+    for name, count, seconds, payload in (("old", len(rows), old_time, old), ("aggregated", 1, new_time, new)):
+        size = len(json.dumps(payload).encode()) / 1024
+        print(f"{name:>12} {count:>8} {seconds * 1000:>9.1f} {len(payload['nodes']):>7} {len(payload['links']):>7} {size:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
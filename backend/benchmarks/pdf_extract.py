@@ -0,0 +1,101 @@
+"""
+Throughput and memory of PDF text extraction on a synthetic many-page PDF.
+
+- sequential: parse_file in one process (peak RSS is the extraction's own)
+- parallel (bytes): parse_document on an in-memory spool, as small uploads are
+- parallel (path):  parse_document on a spool that was rolled over to disk
+
+Each run is a fresh interpreter, so ru_maxrss is that run's own high-water mark.
+
+Run from backend/:  python -m benchmarks.pdf_extract [--pages 500]
+"""
+import subprocess
+import tempfile
+import argparse
+import resource
+import asyncio
+import time
+import sys
+import os
+
+LINE = "The quick brown fox jumps over the lazy dog while graphs of concepts link resources together."
+
+
+def make_pdf(path: str, pages: int, lines_per_page: int = 45):
+    """Write a plain-text PDF by hand (one Helvetica content stream per page)."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        text = "".join(f"({LINE} p{page} l{line}) Tj T* " for line in range(lines_per_page))
+        stream = f"BT /F1 9 Tf 11 TL 36 800 Td {text}ET".encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % k for k in kids), pages)
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+async def _parse(mode: str, path: str) -> str:
+    from app.services.ingest_service import parse_document
+    from app.services.parsing_service import parse_file
+    from app.services.worker_pool import shutdown_pool
+
+    if mode == "sequential":
+        return parse_file(path, "bench.pdf")
+    try:
+        source = path if mode == "parallel-path" else open(path, "rb").read()
+        return await parse_document(source, "bench.pdf")
+    finally:
+        shutdown_pool()
+
+
+def _child(mode: str, path: str):
+    started = time.perf_counter()
+    text = asyncio.run(_parse(mode, path))
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{elapsed:.2f} {peak:.1f} {len(text)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(*args.child)
+        return
+
+    from app.services.worker_pool import PARSE_POOL_WORKERS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.pdf")
+        make_pdf(path, args.pages)
+        print(f"{args.pages} pages, {os.path.getsize(path) / 1024:.0f} KB, {PARSE_POOL_WORKERS} pool workers")
+        print(f"{'mode':>16} {'seconds':>8} {'pages/s':>8} {'peak RSS MB':>12} {'chars':>10}")
+        for mode in ("sequential", "parallel-bytes", "parallel-path"):
+            seconds, peak, chars = subprocess.run(
+                [sys.executable, "-m", "benchmarks.pdf_extract", "--child", mode, path],
+                capture_output=True, text=True, check=True,
+            ).stdout.split()[-3:]
+            print(f"{mode:>16} {seconds:>8} {args.pages / float(seconds):>8.0f} {peak:>12} {chars:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Peak RSS of taking an upload in, for files of increasing size.
+
+Each (mode, size) runs in a fresh interpreter so ru_maxrss is that run's own
+high-water mark (of the API process; pool workers are not included):
+
+- read:   the old path, `await file.read()` of the whole upload
+- spool:  spool_upload (bounded in-memory spool, rolls over to disk, hashed)
+- ingest: spool, parse in the process pool, then stream the body as the
+          storage upload would (the CSV parse is capped by SHEET_MAX_ROWS)
+
+Run from backend/:  python -m benchmarks.upload_memory [--sizes 16 64 256]
+"""
+from fastapi import UploadFile
+import subprocess
+import tempfile
+import argparse
+import resource
+import asyncio
+import sys
+import os
+
+ROW = b"0123456789,lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor\n"
+
+
+def _make_csv(path: str, size_mb: int):
+    block = ROW * (1024 * 1024 // len(ROW))
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+
+
+def _peak_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _run(mode: str, path: str):
+    from app.services.upload_service import spool_upload
+
+    with open(path, "rb") as f:
+        file = UploadFile(file=f, filename=os.path.basename(path))
+        if mode == "read":
+            data = await file.read()
+            assert data
+            return
+
+        upload = await spool_upload(file)
+        try:
+            if mode == "ingest":
+                from app.services.ingest_service import parse_document
+                from app.services.worker_pool import shutdown_pool
+
+                text = await parse_document(upload.path or upload.getvalue(), upload.filename)
+                assert text
+                body = upload.storage_body()
+                try:
+                    if not isinstance(body, bytes):
+                        while body.read(1024 * 1024):
+                            pass
+                finally:
+                    if hasattr(body, "close"):
+                        body.close()
+                shutdown_pool()
+        finally:
+            upload.close()
+
+
+def _child(mode: str, path: str):
+    asyncio.run(_run(mode, path))
+    print(f"{_peak_mb():.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 64, 256], help="file sizes in MB")
+    parser.add_argument("--modes", nargs="+", default=["read", "spool", "ingest"])
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(*args.child)
+        return
+
+    print(f"{'size MB':>8} {'mode':>8} {'peak RSS MB':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = os.path.join(tmp, f"upload-{size}mb.csv")
+            _make_csv(path, size)
+            for mode in args.modes:
+                peak = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.upload_memory", "--child", mode, path],
+                    capture_output=True, text=True, check=True,
+                ).stdout.split()[-1]
+                print(f"{size:>8} {mode:>8} {peak:>12}")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Run from backend/ or the repo root alike
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Tests never talk to Neo4j or Gemini
+os.environ.setdefault("NEO4J_SCHEMA_ON_STARTUP", "0")
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("JWT_SECRET", "test-secret")
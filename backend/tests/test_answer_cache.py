@@ -0,0 +1,43 @@
+import asyncio
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.services import answer_cache as answer_cache_module, project_versions
+from app.services.answer_cache import AnswerCache
+
+
+class DownRedis:
+    async def get(self, key):
+        raise RedisConnectionError("connection refused")
+
+    async def set(self, *args, **kwargs):
+        raise RedisConnectionError("connection refused")
+
+
+def test_redis_read_and_write_failures_are_misses(monkeypatch):
+    monkeypatch.setattr(answer_cache_module, "ANSWER_CACHE_REDIS", True)
+    monkeypatch.setattr(answer_cache_module, "get_async_redis", lambda: DownRedis())
+    cache = AnswerCache(10, 60)
+
+    async def scenario():
+        key = await cache.key("What is entropy?", "p-cache", None)
+        assert await cache.get(key) is None
+        await cache.put(key, {"llm_response": "disorder"})
+        return await cache.get(key)
+
+    assert asyncio.run(scenario()) == {"llm_response": "disorder"}
+    assert cache.stats()["misses"] == 1
+
+
+def test_unknown_project_version_is_not_cached(monkeypatch):
+    monkeypatch.setattr(project_versions, "PROJECT_VERSIONS_REDIS", True)
+    monkeypatch.setattr(project_versions, "get_async_redis", lambda: DownRedis())
+    cache = AnswerCache(10, 60)
+
+    async def scenario():
+        key = await cache.key("What is entropy?", "p-down", None)
+        await cache.put(key, {"llm_response": "disorder"})
+        return key, await cache.get(key)
+
+    assert asyncio.run(scenario()) == (None, None)
+    assert cache.stats()["entries"] == 0
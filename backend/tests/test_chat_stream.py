@@ -0,0 +1,78 @@
+import asyncio
+import json
+import time
+
+from app.main import app
+from app.routes import chat
+from app.services import fake_llm
+
+
+async def _stream(path: str, body: dict):
+    """POST to the ASGI app and return [(seconds since request, body chunk)] as they're sent."""
+    payload = json.dumps(body).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path.split("?")[0], "raw_path": path.split("?")[0].encode(),
+        "query_string": path.partition("?")[2].encode(), "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())],
+        "client": ("test", 1), "server": ("test", 80),
+    }
+    received = []
+
+    async def receive():
+        if received:
+            await asyncio.sleep(3600)
+        received.append(True)
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    chunks = []
+    started = time.perf_counter()
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            chunks.append((time.perf_counter() - started, message["body"].decode()))
+
+    await app(scope, receive, send)
+    return chunks
+
+
+def _events(chunks):
+    events = []
+    for at, chunk in chunks:
+        for block in chunk.strip().split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in block.splitlines())
+            events.append((at, lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_llm_stream_event_order_and_first_event(monkeypatch):
+    async def run_cypher_query(cypher_query, params=None, **kwargs):
+        return {"results": [{"r": {"id": "r1", "name": "notes.pdf"}}], "truncated": False}
+
+    monkeypatch.setattr(chat, "route_query", lambda query, project_id, selected: {
+        "intent": "overview", "confidence": 1.0, "cypher": "MATCH (r:Resource) RETURN r", "params": {},
+    })
+    monkeypatch.setattr(chat, "run_cypher_query", run_cypher_query)
+    monkeypatch.setattr(fake_llm, "FAKE_LLM_FIRST_TOKEN_DELAY", 1.0)
+    monkeypatch.setattr(fake_llm, "FAKE_LLM_TOKEN_DELAY", 0)
+    monkeypatch.setattr(chat.passage_index, "missing", lambda project_id, ids: [])
+    monkeypatch.setattr(chat.passage_index, "select", lambda project_id, ids, query: [
+        {"resource_id": "r1", "position": 0, "text": "Graphs have nodes.", "score": 1.0},
+    ])
+
+    events = _events(asyncio.run(_stream("/chat/llm/stream?project_id=p-stream", {"query": "sse order test"})))
+    names = [name for _, name, _ in events]
+
+    assert names[:2] == ["cypher", "results"]
+    assert names[-1] == "done"
+    assert set(names[2:-1]) == {"token"} and len(names) > 4
+    assert events[1][2]["resources"] == ["notes.pdf"]
+
+    # The fake model takes a second to its first token; the cypher and results
+    # events must go out without waiting for it
+    first_token_at = next(at for at, name, _ in events if name == "token")
+    assert first_token_at >= 1.0
+    assert events[1][0] < first_token_at - 0.5
+
+    answer = "".join(data["text"] for _, name, data in events if name == "token")
+    assert events[-1][2]["llm_response"] == answer
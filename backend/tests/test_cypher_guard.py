@@ -0,0 +1,20 @@
+from app.services.cypher_guard import bound_query, strip_comments
+
+
+def test_trailing_comment_does_not_hide_final_limit():
+    query = "MATCH (r:Resource) RETURN r.name LIMIT 5 // top five"
+    assert bound_query(query, 500) == "MATCH (r:Resource) RETURN r.name LIMIT 5"
+
+
+def test_block_comment_after_limit():
+    query = "MATCH (r:Resource) RETURN r LIMIT $n /* paged */;"
+    assert bound_query(query, 500).endswith("LIMIT $n")
+
+
+def test_limit_is_added_when_missing():
+    assert bound_query("MATCH (c:Concept)-[*]->(d) RETURN d", 10) == "MATCH (c:Concept)-[*1..3]->(d) RETURN d\nLIMIT 10"
+
+
+def test_comment_markers_inside_strings_are_kept():
+    query = "MATCH (r {url: 'http://x/*y*/'}) RETURN r // note"
+    assert strip_comments(query) == "MATCH (r {url: 'http://x/*y*/'}) RETURN r "
@@ -0,0 +1,54 @@
+import asyncio
+import json
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.services import graph_cache, project_versions
+
+
+class DownRedis:
+    async def get(self, key):
+        raise RedisConnectionError("connection refused")
+
+    async def set(self, *args, **kwargs):
+        raise RedisConnectionError("connection refused")
+
+    async def incr(self, key):
+        raise RedisConnectionError("connection refused")
+
+
+def test_graph_falls_back_to_neo4j_when_redis_is_down(monkeypatch):
+    async def fetch_project_graph(project_id):
+        return {"nodes": [{"id": "r1"}], "links": []}
+
+    monkeypatch.setattr(project_versions, "PROJECT_VERSIONS_REDIS", True)
+    monkeypatch.setattr(project_versions, "get_async_redis", lambda: DownRedis())
+    monkeypatch.setattr(graph_cache, "GRAPH_CACHE_REDIS", True)
+    monkeypatch.setattr(graph_cache, "get_async_redis", lambda: DownRedis())
+    monkeypatch.setattr(graph_cache, "fetch_project_graph", fetch_project_graph)
+
+    etag, body = asyncio.run(graph_cache.get_graph_snapshot("p-down"))
+    assert etag is None
+    assert json.loads(body)["nodes"] == [{"id": "r1"}]
+    assert asyncio.run(project_versions.abump_project_version("p-down")) is None
+
+
+def test_graph_snapshot_is_reused_until_the_version_changes(monkeypatch):
+    calls = []
+
+    async def fetch_project_graph(project_id):
+        calls.append(project_id)
+        return {"nodes": [], "links": []}
+
+    monkeypatch.setattr(graph_cache, "fetch_project_graph", fetch_project_graph)
+
+    async def run():
+        first = await graph_cache.get_graph_snapshot("p-local")
+        again = await graph_cache.get_graph_snapshot("p-local")
+        await project_versions.abump_project_version("p-local")
+        changed = await graph_cache.get_graph_snapshot("p-local")
+        return first, again, changed
+
+    first, again, changed = asyncio.run(run())
+    assert first[0] == again[0] != changed[0]
+    assert len(calls) == 2
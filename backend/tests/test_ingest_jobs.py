@@ -0,0 +1,92 @@
+import asyncio
+import os
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.ingest_jobs import IngestQueue, IngestQueueFull, InMemoryJobStore, ingest_queue, no_retry
+
+
+def _auth(user_id: str) -> dict:
+    token = jwt.encode({"user_id": user_id, "email": f"{user_id}@example.com"}, os.environ["JWT_SECRET"], algorithm="HS256")
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def _finished(queue: IngestQueue, job_id: str) -> dict:
+    while True:
+        job = await queue.get(job_id)
+        if job["status"] in ("succeeded", "failed", "partial"):
+            return job
+        await asyncio.sleep(0.01)
+
+
+def test_job_status_is_only_visible_to_its_owner():
+    async def stage(item):
+        item["result"] = {"ok": True}
+
+    with TestClient(app) as client:
+        job_id = client.portal.call(lambda: ingest_queue.submit("test", [{"name": "a"}], [("only", stage)], owner="alice"))
+        client.portal.call(_finished, ingest_queue, job_id)
+
+        assert client.get(f"/resources/jobs/{job_id}").status_code == 401
+        assert client.get(f"/resources/jobs/{job_id}", headers=_auth("bob")).status_code == 404
+        response = client.get(f"/resources/jobs/{job_id}", headers=_auth("alice"))
+        assert response.status_code == 200
+        assert response.json()["status"] == "succeeded"
+
+
+def test_no_retry_stage_runs_once():
+    calls = {"flaky": 0, "insert": 0}
+
+    async def flaky(item):
+        calls["flaky"] += 1
+        if calls["flaky"] < 3:
+            raise RuntimeError("transient")
+
+    @no_retry
+    async def insert(item):
+        calls["insert"] += 1
+        raise RuntimeError("timed out after the write")
+
+    async def run():
+        queue = IngestQueue(InMemoryJobStore(10, 60), workers=1, retries=3, backoff=0)
+        job_id = await queue.submit("test", [{"name": "a"}], [("flaky", flaky), ("insert", insert)])
+        return await _finished(queue, job_id)
+
+    job = asyncio.run(run())
+    assert calls == {"flaky": 3, "insert": 1}
+    assert job["status"] == "failed"
+    assert job["items"][0]["stage"] == "insert"
+
+
+def test_in_memory_store_is_bounded():
+    store = InMemoryJobStore(max_jobs=2, ttl=60)
+
+    async def run():
+        for job_id in ("a", "b", "c"):
+            await store.save({"id": job_id})
+        return [await store.get(job_id) for job_id in ("a", "b", "c")]
+
+    assert asyncio.run(run()) == [None, {"id": "b"}, {"id": "c"}]
+
+
+def test_full_queue_rejects_new_jobs():
+    async def run():
+        release = asyncio.Event()
+
+        async def stage(item):
+            await release.wait()
+
+        queue = IngestQueue(InMemoryJobStore(10, 60), workers=1, retries=1, backoff=0, max_queued=1)
+        running = await queue.submit("test", [{"name": "a"}], [("wait", stage)])
+        await asyncio.sleep(0)  # the worker takes the first job
+        queued = await queue.submit("test", [{"name": "b"}], [("wait", stage)])
+        with pytest.raises(IngestQueueFull):
+            await queue.submit("test", [{"name": "c"}], [("wait", stage)])
+
+        release.set()
+        return [(await _finished(queue, job_id))["status"] for job_id in (running, queued)]
+
+    assert asyncio.run(run()) == ["succeeded", "succeeded"]
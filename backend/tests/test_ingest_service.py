@@ -0,0 +1,63 @@
+import asyncio
+
+from app.services import ingest_service
+
+
+def test_failed_concept_batch_only_fails_the_bad_text(monkeypatch):
+    async def fake_run_in_pool(fn, arg):
+        if fn is ingest_service.extract_concepts_batch:
+            raise RuntimeError("batch failed")
+        if arg == "bad":
+            raise ValueError("bad text")
+        return [arg.upper()]
+
+    monkeypatch.setattr(ingest_service, "run_in_pool", fake_run_in_pool)
+    good, bad, other = asyncio.run(ingest_service.extract_concepts_many(["good", "bad", "other"]))
+
+    assert good == ["GOOD"]
+    assert isinstance(bad, ValueError)
+    assert other == ["OTHER"]
+
+
+def test_in_memory_pdf_is_extracted_in_page_ranges(monkeypatch, tmp_path):
+    from benchmarks.pdf_extract import make_pdf
+
+    path = tmp_path / "doc.pdf"
+    make_pdf(str(path), pages=120, lines_per_page=2)
+    calls = []
+
+    async def fake_run_in_pool(fn, *args):
+        calls.append(fn.__name__)
+        return fn(*args)
+
+    monkeypatch.setattr(ingest_service, "run_in_pool", fake_run_in_pool)
+    monkeypatch.setattr(ingest_service, "PARSE_POOL_WORKERS", 4)
+    text = asyncio.run(ingest_service.parse_document(path.read_bytes(), "doc.pdf"))
+
+    assert calls.count("extract_pdf_range") == 3
+    assert "p0 l0" in text and "p119 l1" in text
+    assert text.index("p59 l1") < text.index("p60 l0")
+
+
+def test_graph_failure_after_insert_is_reported_per_file(monkeypatch):
+    async def bulk(resources, project_id, uploaded_by=None):
+        raise RuntimeError("neo4j unavailable")
+
+    written = []
+
+    async def single(resource_id, name, project_id, concepts, uploaded_by=None):
+        if resource_id == "r2":
+            raise RuntimeError("constraint violated")
+        written.append(resource_id)
+
+    monkeypatch.setattr(ingest_service, "add_resources_with_concepts", bulk)
+    monkeypatch.setattr(ingest_service, "add_resource_with_concepts", single)
+    results = [{"status": "success", "resource_id": "r1"}, {"status": "success", "resource_id": "r2"}]
+    resources = [{"index": i, "id": f"r{i + 1}", "name": f"f{i}", "concepts": []} for i in range(2)]
+
+    asyncio.run(ingest_service.write_batch_graph(resources, "p", "u", results))
+
+    assert written == ["r1"]
+    assert results[0]["status"] == "success"
+    assert results[1]["status"] == "partial" and results[1]["resource_id"] == "r2"
+    assert "constraint violated" in results[1]["error"]
@@ -0,0 +1,15 @@
+from app.services.intent_router import classify_intent, fulltext_search, route_query
+
+
+def test_resource_name_must_match_whole_words():
+    assert classify_intent("summarise the footnotes", ["notes.pdf"])[0] != "resource"
+    assert classify_intent("what is in notes", ["notes.pdf"]) == ("resource", 0.95, {"resource_names": ["notes.pdf"]})
+
+
+def test_short_and_numeric_tokens_are_not_fuzzy_matched():
+    assert fulltext_search("chapter 3 of ai in 2024") == "chapter~"
+
+
+def test_long_what_is_question_goes_to_the_llm():
+    assert route_query("what is the difference between a process and a thread", "p1") is None
+    assert route_query("what is entropy", "p1")["params"]["search"] == "entropy~"
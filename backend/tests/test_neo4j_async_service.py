@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+from neo4j.exceptions import Neo4jError
+
+from app.services.neo4j_async_service import _run_prepared
+
+QUERY = "MATCH (r:Resource) WHERE r.name = 'notes.pdf' RETURN r"
+
+
+def failing_once(code):
+    calls = []
+
+    async def run(query, params):
+        calls.append((query, params))
+        if len(calls) == 1:
+            raise Neo4jError._hydrate_neo4j(code=code, message="failed")
+        return "rows"
+
+    return run, calls
+
+
+def test_statement_error_runs_the_query_as_written():
+    run, calls = failing_once("Neo.ClientError.Statement.SyntaxError")
+    assert asyncio.run(_run_prepared(run, QUERY, None)) == "rows"
+    assert calls[0][0] != QUERY
+    assert calls[1] == (QUERY, {})
+
+
+def test_timeout_is_not_retried():
+    run, calls = failing_once("Neo.ClientError.Transaction.TransactionTimedOutClientConfiguration")
+    with pytest.raises(Neo4jError):
+        asyncio.run(_run_prepared(run, QUERY, None))
+    assert len(calls) == 1
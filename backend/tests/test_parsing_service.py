@@ -0,0 +1,15 @@
+import io
+
+from app.services.parsing_service import iter_spreadsheet_rows
+
+
+def test_csv_row_with_oversized_cell_is_skipped():
+    data = "a,b\nx," + "y" * 200_000 + ",z\nc,d\n"
+    rows = list(iter_spreadsheet_rows(io.BytesIO(data.encode()), "csv"))
+    assert rows == ["a b", "c d"]
+
+
+def test_csv_cells_are_truncated_and_rows_capped():
+    data = "".join(f"{i},{'v' * 50}\n" for i in range(10))
+    rows = list(iter_spreadsheet_rows(io.BytesIO(data.encode()), "csv", max_rows=3, max_cell_chars=5))
+    assert rows == ["0 vvvvv", "1 vvvvv", "2 vvvvv"]
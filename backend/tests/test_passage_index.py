@@ -0,0 +1,21 @@
+import os
+
+from app.services.passage_index import PassageIndex, chunk_text
+
+
+def test_chunks_overlap_long_paragraphs():
+    text = "a b c\n\nd e\n\n" + " ".join(str(i) for i in range(12))
+    assert chunk_text(text, words=5, overlap=2) == ["a b c d e", "0 1 2 3 4", "3 4 5 6 7", "6 7 8 9 10", "9 10 11"]
+
+
+def test_select_ranks_passages_within_budget(tmp_path):
+    index = PassageIndex(str(tmp_path))
+    index.index_resource("p", "r1", "Cats purr and sleep.\n\n" + "filler " * 200)
+    index.index_resource("p", "r2", "Graph theory studies nodes and edges.")
+
+    selected = index.select("p", ["r1", "r2"], "what is graph theory", top_k=2, token_budget=50)
+    assert selected[0]["resource_id"] == "r2"
+    assert sum(len(p["text"]) // 4 for p in selected) <= 50
+
+    # Written atomically: only the index files are left behind
+    assert sorted(os.listdir(tmp_path / "p")) == ["r1.json", "r2.json"]
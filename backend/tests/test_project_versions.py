@@ -0,0 +1,20 @@
+from app.services import project_versions
+
+
+def test_warns_for_multiple_workers_with_in_memory_versions(monkeypatch, capsys):
+    monkeypatch.setattr(project_versions, "PROJECT_VERSIONS_REDIS", False)
+    monkeypatch.setattr(project_versions.sys, "argv", ["uvicorn", "app.main:app", "--workers", "4"])
+    project_versions.check_version_backend()
+    assert "4 workers with in-memory project versions" in capsys.readouterr().out
+
+    monkeypatch.setattr(project_versions, "PROJECT_VERSIONS_REDIS", True)
+    project_versions.check_version_backend()
+    assert capsys.readouterr().out == ""
+
+
+def test_single_worker_does_not_warn(monkeypatch, capsys):
+    monkeypatch.setattr(project_versions, "PROJECT_VERSIONS_REDIS", False)
+    monkeypatch.setattr(project_versions.sys, "argv", ["uvicorn", "app.main:app"])
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    project_versions.check_version_backend()
+    assert capsys.readouterr().out == ""
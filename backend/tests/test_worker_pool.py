@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.worker_pool import ProcessPool, run_in_pool
+
+
+def test_api_responds_during_long_parse():
+    with TestClient(app) as client:
+        # A parse-sized job on the app's own event loop
+        parse = client.portal.start_task_soon(run_in_pool, time.sleep, 3)
+        time.sleep(0.5)
+
+        started = time.perf_counter()
+        response = client.get("/")
+        elapsed = time.perf_counter() - started
+
+        assert response.status_code == 200
+        assert elapsed < 1
+        assert not parse.done()
+        parse.result(timeout=10)
+
+
+def test_timeout_only_fails_its_own_job():
+    pool = ProcessPool(workers=3, timeout=30)
+
+    async def jobs():
+        return await asyncio.gather(
+            pool.run(time.sleep, 10, timeout=1),
+            pool.run(time.sleep, 2),
+            pool.run(time.sleep, 2),
+            return_exceptions=True,
+        )
+
+    try:
+        started = time.perf_counter()
+        stuck, first, second = asyncio.run(jobs())
+        assert isinstance(stuck, TimeoutError)
+        assert first is None and second is None
+        assert time.perf_counter() - started < 5
+
+        # The retired pool is gone once its other jobs finished; new jobs get a fresh one
+        assert asyncio.run(pool.run(pow, 2, 10)) == 1024
+        assert len(pool._pending) == 1 and not pool._retired
+    finally:
+        pool.shutdown()
+
+
+def test_queue_wait_does_not_count_towards_timeout():
+    pool = ProcessPool(workers=1, timeout=2)
+
+    async def jobs():
+        return await asyncio.gather(*[pool.run(time.sleep, 1.2) for _ in range(3)], return_exceptions=True)
+
+    try:
+        assert asyncio.run(jobs()) == [None, None, None]
+        assert not pool._retired
+    finally:
+        pool.shutdown()